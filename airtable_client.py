@@ -0,0 +1,172 @@
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Airtable configuration
+AIRTABLE_PAT = "patC3CJ296jcbbAMd.e12065cdff24c5b8e6ed1e9315fa4f5a9233ee9803efd602a7a2a74ff14c5057"
+AIRTABLE_BASE_ID = "appdeZcAttBaG5oVI"
+AIRTABLE_TABLE_NAME = "Politicians"
+
+AIRTABLE_URL = f'https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}'
+PAGE_SIZE = 100  # Airtable's maximum page size
+BATCH_SIZE = 10  # Airtable's maximum records per write
+AIRTABLE_RATE = 5  # Airtable allows 5 requests per second per base
+AIRTABLE_CONCURRENCY = 3  # Write requests in flight at once
+WRITE_BATCH_SIZE = BATCH_SIZE * AIRTABLE_CONCURRENCY  # Updates handed to update_records per flush
+CHUNK_ATTEMPTS = 3
+AIRTABLE_TIMEOUT = 30
+MAX_ATTEMPTS = 5
+DEFAULT_RETRY_AFTER = 30  # Airtable's penalty after a 429, used when Retry-After is missing
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def airtable_headers():
+    return {
+        'Authorization': f'Bearer {AIRTABLE_PAT}',
+        'Content-Type': 'application/json',
+    }
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every request to the base.
+
+    capacity=1 spaces requests evenly, so no one-second window sees more
+    than rate of them. pause() stops every thread after a 429 instead of
+    letting each one burn its own retries.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.updated = self.paused_until
+            self.tokens = 0
+
+RATE_LIMITER = RateLimiter(AIRTABLE_RATE)
+
+def get_session():
+    """Return the shared keep-alive session for Airtable, with auth headers set once."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=AIRTABLE_CONCURRENCY * 2))
+            _session.headers.update(airtable_headers())
+        return _session
+
+def retry_after_seconds(response):
+    """Seconds to wait from a Retry-After header, given as seconds or as an HTTP date."""
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+def airtable_request(method, **kwargs):
+    """Send one request to the table through the rate limiter, waiting out 429 responses."""
+    for attempt in range(MAX_ATTEMPTS):
+        RATE_LIMITER.acquire()
+        response = get_session().request(method, AIRTABLE_URL, timeout=AIRTABLE_TIMEOUT, **kwargs)
+        if response.status_code != 429:
+            return response
+        retry_after = retry_after_seconds(response)
+        print(f"Airtable rate limit hit, waiting {retry_after:.0f}s")
+        RATE_LIMITER.pause(retry_after)
+    return response
+
+def not_blank_formula(*fields):
+    """Build a filterByFormula that keeps records where any of the fields is filled in."""
+    conditions = [f"{{{field}}} != ''" for field in fields]
+    if len(conditions) == 1:
+        return conditions[0]
+    return f"OR({', '.join(conditions)})"
+
+def iter_airtable_pages(fields=None, formula=None, page_size=PAGE_SIZE):
+    """Yield each page of records as it arrives, following Airtable's offset cursor.
+
+    fields limits the columns returned and formula is passed through as
+    filterByFormula so filtering happens server-side.
+    """
+    params = [('fields[]', field) for field in fields or []]
+    if formula:
+        params.append(('filterByFormula', formula))
+    params.append(('pageSize', page_size))
+
+    offset = None
+    while True:
+        page_params = params + ([('offset', offset)] if offset else [])
+        response = airtable_request('GET', params=page_params)
+        response.raise_for_status()
+        data = response.json()
+        yield data.get('records', [])
+
+        offset = data.get('offset')
+        if not offset:
+            return
+
+def _write_chunk(chunk, attempts):
+    """PATCH one chunk of at most 10 records; True once Airtable accepts it."""
+    for attempt in range(attempts):
+        try:
+            response = airtable_request('PATCH', json={'records': chunk})
+        except requests.RequestException as e:
+            print(f"Error updating Airtable records: {str(e)}")
+        else:
+            if response.status_code == 200:
+                print(f"Successfully updated batch of {len(chunk)} records in Airtable")
+                return True
+            print(f"Error updating Airtable records: {response.status_code}")
+            print(response.text)
+            if response.status_code < 500 and response.status_code != 429:
+                return False  # The request itself is bad, sending it again will not help
+        if attempt + 1 < attempts:
+            time.sleep(2 ** attempt)
+    return False
+
+def update_records(records, concurrency=AIRTABLE_CONCURRENCY, attempts=CHUNK_ATTEMPTS):
+    """Update records given as {'id': ..., 'fields': {...}} dicts, 10 per request.
+
+    Up to concurrency requests are in flight at once, still paced by the
+    shared rate limiter. A chunk that fails is retried on its own.
+    Returns one success flag per record, in order.
+    """
+    chunks = [records[i:i + BATCH_SIZE] for i in range(0, len(records), BATCH_SIZE)]
+    if len(chunks) <= 1 or concurrency <= 1:
+        written = [_write_chunk(chunk, attempts) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+            written = list(executor.map(lambda chunk: _write_chunk(chunk, attempts), chunks))
+    return [ok for chunk, ok in zip(chunks, written) for _ in chunk]
@@ -0,0 +1,152 @@
+import sys
+import asyncio
+import argparse
+import datetime
+from urllib.parse import urlparse
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from airtable_client import iter_airtable_pages, not_blank_formula, update_records
+from handles import canonical_handle
+from http_fetch import USER_AGENT
+from platforms import PLATFORMS as ALL_PLATFORMS, load_scraper
+
+# Platforms whose counts are present in server-rendered HTML. Twitter renders
+# client-side only, so it still needs the Selenium scraper.
+PLATFORMS = {platform: config for platform, config in ALL_PLATFORMS.items() if config['static_html']}
+
+
+class TokenBucket:
+    """Async token bucket: allows `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self.updated is not None:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class HostLimiter:
+    """Caps concurrent requests and request rate separately for every host."""
+
+    def __init__(self, concurrency, rate):
+        self.concurrency = concurrency
+        self.rate = rate
+        self._semaphores = {}
+        self._buckets = {}
+
+    def _for_host(self, url):
+        host = urlparse(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.concurrency)
+            self._buckets[host] = TokenBucket(self.rate)
+        return self._semaphores[host], self._buckets[host]
+
+    async def get(self, session, url):
+        semaphore, bucket = self._for_host(url)
+        async with semaphore:
+            await bucket.acquire()
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return None
+                return await response.text()
+
+def fetch_airtable_records(fields):
+    """Every record with any of the fields filled in, through the shared Airtable client."""
+    return [record for page in iter_airtable_pages(fields=fields, formula=not_blank_formula(*fields))
+            for record in page]
+
+async def scrape_handle(session, limiter, platform, username):
+    """Fetch one profile page and parse it with the platform's own extractor."""
+    config = PLATFORMS[platform]
+    url = config['url'].format(username=username)
+    try:
+        html = await limiter.get(session, url)
+    except Exception as e:
+        print(f"[{platform}] Error fetching {username}: {str(e)}")
+        return None
+    if html is None:
+        return None
+    soup = await asyncio.to_thread(BeautifulSoup, html, 'html.parser')
+    return load_scraper(platform).extract_count_from_html(soup)
+
+async def run(platforms, concurrency, rate, dry_run=False):
+    timeout = aiohttp.ClientTimeout(total=20)
+    async with aiohttp.ClientSession(headers={'User-Agent': USER_AGENT}, timeout=timeout) as session:
+        fields = [PLATFORMS[platform]['username_field'] for platform in platforms]
+        print("Fetching usernames from Airtable...")
+        # Airtable goes through the shared rate-limited client, off the event loop
+        try:
+            records = await asyncio.to_thread(fetch_airtable_records, fields)
+        except Exception as e:
+            print(f"Error fetching Airtable records: {str(e)}")
+            records = []
+        print(f"Found {len(records)} records")
+
+        # One fetch per distinct (platform, canonical handle); invalid handles are skipped
+        wanted = [(record['id'], platform,
+                   canonical_handle(platform, record.get('fields', {}).get(PLATFORMS[platform]['username_field'])))
+                  for record in records for platform in platforms]
+        wanted = [(record_id, platform, handle) for record_id, platform, handle in wanted if handle]
+        jobs = sorted({(platform, handle) for _, platform, handle in wanted})
+        print(f"Scraping {len(jobs)} profiles...")
+
+        limiter = HostLimiter(concurrency, rate)
+        counts = await asyncio.gather(*(scrape_handle(session, limiter, platform, username)
+                                        for platform, username in jobs))
+        found = {job: count for job, count in zip(jobs, counts) if count is not None}
+
+        updates = {}
+        for record_id, platform, handle in wanted:
+            if (platform, handle) in found:
+                record_fields = updates.setdefault(record_id, {})
+                record_fields[PLATFORMS[platform]['followers_field']] = int(found[(platform, handle)])
+
+        success_count = 0
+        if updates and not dry_run:
+            payloads = [{'id': record_id, 'fields': fields} for record_id, fields in updates.items()]
+            written = await asyncio.to_thread(update_records, payloads)
+            success_count = sum(written)
+
+    print("\nFinal Results:")
+    print("-" * 50)
+    for platform in platforms:
+        platform_jobs = [job for job in jobs if job[0] == platform]
+        hits = sum(1 for job in platform_jobs if job in found)
+        print(f"{platform}: {hits}/{len(platform_jobs)} profiles read")
+    missed = [f"{platform}:{username}" for platform, username in jobs if (platform, username) not in found]
+    if missed:
+        print(f"\nNo count in static HTML for {len(missed)} profiles (run the Selenium scrapers for these):")
+        print(", ".join(missed))
+    print(f"\nTimestamp: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Successfully updated {success_count} out of {len(updates)} records in Airtable")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh follower counts concurrently over plain HTTP")
+    parser.add_argument('--platforms', nargs='+', choices=sorted(PLATFORMS), default=sorted(PLATFORMS))
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help="Maximum concurrent requests per host")
+    parser.add_argument('--rate', type=float, default=2.0,
+                        help="Maximum requests per second per host")
+    parser.add_argument('--dry-run', action='store_true', help="Scrape but do not write to Airtable")
+    args = parser.parse_args()
+
+    if args.concurrency < 1 or args.rate <= 0:
+        print("--concurrency and --rate must be positive")
+        sys.exit(1)
+
+    asyncio.run(run(args.platforms, args.concurrency, args.rate, args.dry_run))
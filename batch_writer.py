@@ -0,0 +1,77 @@
+import queue
+import threading
+
+_STOP = object()
+
+
+class BatchWriter:
+    """Background consumer that flushes queued updates in fixed-size batches.
+
+    Scraper workers call put() as each result is produced; the writer thread
+    calls flush(batch) as soon as batch_size updates are waiting, or after
+    flush_interval seconds of quiet so a slow tail is not held back.
+    flush returns True/False for the whole batch or one flag per update.
+    """
+
+    def __init__(self, flush, batch_size=10, flush_interval=5.0):
+        self.flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.submitted = 0
+        self.success_count = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def put(self, update):
+        self.submitted += 1
+        self._queue.put(update)
+
+    def close(self):
+        """Flush whatever is left, stop the thread and return the number of updates written."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        return self.success_count
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        batch = []
+        while True:
+            try:
+                update = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if batch:
+                    self._flush(batch)
+                    batch = []
+                continue
+
+            if update is _STOP:
+                break
+            batch.append(update)
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+
+        if batch:
+            self._flush(batch)
+
+    def _flush(self, batch):
+        """Write batch and return the updates that made it."""
+        try:
+            written = self.flush(batch)
+        except Exception as e:
+            print(f"Error writing batch of {len(batch)} updates: {str(e)}")
+            return []
+        if isinstance(written, bool) or written is None:
+            written = [bool(written)] * len(batch)
+        written = [update for update, ok in zip(batch, written) if ok]
+        self.success_count += len(written)
+        return written
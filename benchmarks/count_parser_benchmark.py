@@ -0,0 +1,126 @@
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+# Run from anywhere: the scrapers live one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from count_parser import parse_count, parse_counts
+
+# The per-scraper parsers before count_parser, which only differed in their
+# regex, and Instagram's digit filter. Kept as the baseline.
+LEGACY_PATTERNS = {
+    'twitter': (r'([\d,\.]+\s*[KMBkmb]?)\s*(?:Followers?)?', 0),
+    'instagram': (r'([\d,\.]+\s*[KMBkmb]?)\s*(?:followers?)?', re.IGNORECASE),
+    'youtube': (r'([\d,\.]+\s*[KMBkmb]?)\s*(?:subscriber)s?', 0),
+    'facebook': (r'([\d,\.]+\s*[KMBkmb]?)\s*(?:people follow this|followers?)?', re.IGNORECASE),
+}
+
+def legacy_parse(text, pattern, flags):
+    try:
+        text = text.strip()
+        number_match = re.search(pattern, text, flags)
+        if number_match:
+            number_str = number_match.group(1).strip()
+            multiplier = 1
+            if number_str[-1].upper() == 'K':
+                multiplier = 1000
+                number_str = number_str[:-1]
+            elif number_str[-1].upper() == 'M':
+                multiplier = 1000000
+                number_str = number_str[:-1]
+            elif number_str[-1].upper() == 'B':
+                multiplier = 1000000000
+                number_str = number_str[:-1]
+            number_str = number_str.replace(',', '')
+            return float(number_str) * multiplier
+    except Exception:
+        pass
+    return None
+
+def legacy_digit_filter(text):
+    count = ''.join(filter(str.isdigit, text))
+    return int(count) if count else None
+
+# Raw strings as the scrapers see them, with the count they should parse to
+CASES = [
+    ('2,771 Followers', 2771),
+    ('100K Followers', 100000),
+    ('1.2M', 1200000),
+    ('1.15M subscribers', 1150000),
+    ('12.3K subscribers', 12300),
+    ('1 subscriber', 1),
+    ('3 million people follow this', 3000000),
+    ('45,210 people follow this', 45210),
+    ('1,234 Followers, 56 Following, 78 Posts - See Instagram photos', 1234),
+    ('1.234.567 Follower', 1234567),
+    ('1,2 Mio. Abonnenten', 1200000),
+    ('12\u00a0345 abonn\u00e9s', 12345),
+    ("1'234 Follower", 1234),
+    ('2.5B', 2500000000),
+    ('no count here', None),
+]
+
+def check_cases():
+    """Print every case the new parser gets wrong (and what the old ones made of it)."""
+    failures = 0
+    vectorized = parse_counts([text for text, _ in CASES]).tolist()
+    for (text, expected), batch in zip(CASES, vectorized):
+        got = parse_count(text)
+        batch = None if pd.isna(batch) else batch
+        if got != expected or batch != expected:
+            failures += 1
+            print(f"  MISMATCH {text!r}: parse_count={got} parse_counts={batch} expected={expected}")
+    print(f"{len(CASES) - failures}/{len(CASES)} cases parsed correctly")
+
+    print(f"\n  {'raw text':<36} {'expected':>12} {'old twitter':>14} {'old ig digits':>14}")
+    for text, expected in CASES:
+        old = legacy_parse(text, *LEGACY_PATTERNS['twitter'])
+        digits = legacy_digit_filter(text)
+        if old != expected or digits != expected:
+            print(f"  {text[:36]:<36} {str(expected):>12} {str(old):>14} {str(digits):>14}")
+
+# Display formats the platforms use, filled with random counts
+FORMATS = [
+    lambda n: f"{n:,} Followers",
+    lambda n: f"{n / 1000:.1f}K Followers",
+    lambda n: f"{n / 1e6:.2f}M subscribers",
+    lambda n: f"{n:,} people follow this",
+    lambda n: f"{n:,} Followers, {n // 7:,} Following, {n // 50:,} Posts - See Instagram photos",
+]
+
+def make_texts(size, distinct):
+    """size raw strings drawn from a pool of distinct ones."""
+    pool = [random.choice(FORMATS)(random.randint(1, 50000000)) for _ in range(distinct)]
+    return [random.choice(pool) for _ in range(size)]
+
+def timed(label, fn, size):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:>9.1f}ms {elapsed / size * 1e6:>9.2f}us/string")
+
+def benchmark(texts):
+    series = pd.Series(texts)
+    for platform, (pattern, flags) in LEGACY_PATTERNS.items():
+        timed(f"old {platform}", lambda: [legacy_parse(text, pattern, flags) for text in texts], len(texts))
+    timed("parse_count loop", lambda: [parse_count(text) for text in texts], len(texts))
+    timed("parse_counts (Series)", lambda: parse_counts(series), len(texts))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare count_parser with the old per-scraper parsers")
+    parser.add_argument('--size', type=int, default=100000, help="Raw strings to parse per run")
+    parser.add_argument('--distinct', type=int, nargs='+', default=[1000, 100000],
+                        help="Distinct strings among them (capped at --size)")
+    args = parser.parse_args()
+
+    check_cases()
+    for distinct in args.distinct:
+        distinct = min(distinct, args.size)
+        print(f"\nParsing {args.size:,} strings ({distinct:,} distinct)")
+        benchmark(make_texts(args.size, distinct))
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Run from anywhere: the scrapers live one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from platforms import PLATFORMS, load_scraper
+from resource_blocking import TransferStats
+
+# Each mode loads the same profiles: (label, page load strategy, block resources)
+MODES = [
+    ('full', 'normal', False),
+    ('blocked', 'normal', True),
+    ('blocked+eager', 'eager', True),
+]
+
+
+def load_profiles(platform, usernames, page_load_strategy, block_resources, stats, label):
+    """Load every profile in a fresh session and return the per-page load times in seconds."""
+    scraper = load_scraper(platform)
+    driver = scraper.create_driver(page_load_strategy, block_resources, network_stats=True)
+    times = []
+    try:
+        driver.get_log('performance')  # Drop the startup noise
+        for username in usernames:
+            start = time.perf_counter()
+            driver.get(PLATFORMS[platform]['url'].format(username=username))
+            times.append(time.perf_counter() - start)
+            stats.collect(driver, label)
+    finally:
+        driver.quit()
+    return times
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure bytes and load time saved by resource blocking")
+    parser.add_argument('platform', choices=list(PLATFORMS))
+    parser.add_argument('usernames', nargs='+', help="Profiles to load in every mode")
+    parser.add_argument('--modes', nargs='+', choices=[label for label, _, _ in MODES],
+                        default=[label for label, _, _ in MODES])
+    args = parser.parse_args()
+
+    stats = TransferStats()
+    load_times = {}
+    for label, page_load_strategy, block_resources in MODES:
+        if label in args.modes:
+            load_times[label] = load_profiles(args.platform, args.usernames, page_load_strategy,
+                                              block_resources, stats, label)
+
+    baseline = stats.bytes_per_page('full') if 'full' in load_times else None
+    print(f"\n{args.platform}: {len(args.usernames)} profiles per mode")
+    print(f"  {'mode':<14} {'KB/page':>8} {'saved KB/page':>14} {'median load':>12}")
+    for label, times in load_times.items():
+        per_page = stats.bytes_per_page(label) or 0
+        saved = f"{(baseline - per_page) / 1024:>14.0f}" if baseline is not None else f"{'-':>14}"
+        print(f"  {label:<14} {per_page / 1024:>8.0f} {saved} {statistics.median(times):>11.2f}s")
+    for label in load_times:
+        stats.report(label)
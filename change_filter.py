@@ -0,0 +1,41 @@
+import threading
+
+
+class ChangeFilter:
+    """Keeps only updates that change what Airtable already holds.
+
+    add() remembers the current value of a field as it was read; should_write()
+    is then asked for every new count. Blank fields are always written, and
+    with min_delta a count has to move by at least that much to be written.
+    """
+
+    def __init__(self, min_delta=0):
+        self.min_delta = min_delta
+        self.current = {}  # (record_id, field) -> value in Airtable
+        self.written = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def add(self, record_id, field, value):
+        with self._lock:
+            self.current[(record_id, field)] = value
+
+    def should_write(self, record_id, field, count):
+        with self._lock:
+            current = self.current.get((record_id, field))
+            try:
+                delta = abs(int(count) - int(current))
+                write = delta > 0 and delta >= self.min_delta
+            except (TypeError, ValueError):
+                write = True  # Blank or not a number
+            if write:
+                # Later results for the same record are compared with this one
+                self.current[(record_id, field)] = int(count)
+                self.written += 1
+            else:
+                self.skipped += 1
+            return write
+
+    def report(self):
+        threshold = f" or moved by less than {self.min_delta}" if self.min_delta else ""
+        print(f"Skipped {self.skipped} counts Airtable already had{threshold}; {self.written} changed")
@@ -0,0 +1,104 @@
+import os
+import json
+import threading
+
+from batch_writer import BatchWriter
+
+CHECKPOINT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'socialscraper', 'checkpoints')
+
+
+def checkpoint_path(name):
+    """Default journal location for a script, e.g. twitter or all."""
+    return os.path.join(CHECKPOINT_DIR, f'{name}.jsonl')
+
+class Checkpoint:
+    """Append-only JSONL journal of scrape results and Airtable writes.
+
+    Every result is appended as soon as it is produced, every update as it is
+    queued for Airtable and again once its batch is written. A fresh run
+    starts a new journal; with resume=True the existing journal is loaded so
+    finished handles can be skipped and unwritten updates replayed.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.completed = {}  # (platform, username) -> result
+        self.unflushed = {}  # update key -> update queued but never written
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if resume and os.path.exists(path):
+            self._load()
+            print(f"Resuming from {path}: {len(self.completed)} handles done, "
+                  f"{len(self.unflushed)} Airtable updates to replay")
+        self._file = open(path, 'a' if resume else 'w')
+
+    def _load(self):
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line from a crash
+                if entry['event'] == 'result':
+                    self.completed[(entry['platform'], entry['result']['username'])] = entry['result']
+                elif entry['event'] == 'queued':
+                    self.unflushed[entry['key']] = entry['update']
+                elif entry['event'] == 'flushed':
+                    for key in entry['keys']:
+                        self.unflushed.pop(key, None)
+
+    def _append(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+
+    def is_done(self, platform, username):
+        return (platform, username) in self.completed
+
+    def record_result(self, platform, result):
+        """Journal a finished handle; failed handles are retried on resume."""
+        if result.get('follower_count') is None:
+            return
+        self.completed[(platform, result['username'])] = result
+        self._append({'event': 'result', 'platform': platform, 'result': result})
+
+    def record_queued(self, key, update):
+        self._append({'event': 'queued', 'key': key, 'update': update})
+
+    def record_flushed(self, keys):
+        self._append({'event': 'flushed', 'keys': keys})
+
+    def close(self):
+        self._file.close()
+
+class JournaledWriter(BatchWriter):
+    """BatchWriter that journals queued and written updates in a Checkpoint.
+
+    On start it replays updates a previous run queued but never wrote.
+    key(update) must return the Airtable record id the update targets.
+    """
+
+    def __init__(self, flush, checkpoint, key, **kwargs):
+        super().__init__(flush, **kwargs)
+        self.checkpoint = checkpoint
+        self.key = key
+
+    def start(self):
+        super().start()
+        if self.checkpoint.unflushed:
+            print(f"Replaying {len(self.checkpoint.unflushed)} unwritten Airtable updates")
+        for update in self.checkpoint.unflushed.values():
+            super().put(update)
+        return self
+
+    def put(self, update):
+        self.checkpoint.record_queued(self.key(update), update)
+        super().put(update)
+
+    def _flush(self, batch):
+        # Only updates that were written are marked; the rest replay on resume
+        written = super()._flush(batch)
+        if written:
+            self.checkpoint.record_flushed([self.key(update) for update in written])
+        return written
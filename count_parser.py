@@ -0,0 +1,69 @@
+import re
+import functools
+
+import pandas as pd
+
+SUFFIX_PATTERN = r"millions?|millionen|milliarden|billions?|thousands?|tausend|tsd|mio|mrd|mn|bn|k|m|b"
+
+# A count as the platforms display it: "2,771", "1.234.567", "12 345", "1.2M",
+# "1,5 Mio.", "3 million". Three-digit groups after a separator are thousands,
+# except a single group right before a suffix: "1.234M" is 1.234 million. One or
+# two digits after the last separator are decimals, which only make sense with
+# a suffix.
+NUMBER_PATTERN = (
+    r"(?<!\d)(?P<whole>\d+(?=[.,]\d{3}\s*(?:" + SUFFIX_PATTERN + r")(?![a-z]))"
+    r"|\d{1,3}(?:[ ,.'\u2019\u00a0\u202f\u2009]\d{3})+(?!\d)|\d+)"
+    r"(?:[.,](?P<fraction>\d{1,2}(?!\d)|\d{3}(?=\s*(?:" + SUFFIX_PATTERN + r")(?![a-z]))))?"
+    r"\s*(?P<suffix>" + SUFFIX_PATTERN + r")?(?![a-z])"
+)
+SEPARATOR_RE = re.compile(r"[ ,.'\u2019\u00a0\u202f\u2009]")
+
+MULTIPLIERS = {
+    'k': 10 ** 3, 'thousand': 10 ** 3, 'thousands': 10 ** 3, 'tausend': 10 ** 3, 'tsd': 10 ** 3,
+    'm': 10 ** 6, 'mn': 10 ** 6, 'mio': 10 ** 6, 'million': 10 ** 6, 'millions': 10 ** 6, 'millionen': 10 ** 6,
+    'b': 10 ** 9, 'bn': 10 ** 9, 'mrd': 10 ** 9, 'billion': 10 ** 9, 'billions': 10 ** 9, 'milliarden': 10 ** 9,
+}
+
+# Labels the platforms put after the number
+FOLLOWERS_LABEL = r'followers?|people follow this'
+SUBSCRIBERS_LABEL = r'subscribers?'
+
+
+@functools.lru_cache(maxsize=None)
+def count_pattern(label=None):
+    """Compiled count pattern; with label the number must be followed by it."""
+    pattern = NUMBER_PATTERN
+    if label:
+        pattern += r'\s*(?:' + label + r')'
+    return re.compile(pattern, re.IGNORECASE)
+
+def parse_count(text, label=None):
+    """Parse the first count in text (e.g. '1.2M subscribers' -> 1200000), or None.
+
+    With label (a regex such as SUBSCRIBERS_LABEL) only a number followed by
+    that label counts, so other numbers on the page are skipped.
+    """
+    if not text:
+        return None
+    match = count_pattern(label).search(text)
+    if not match:
+        return None
+    number = float(SEPARATOR_RE.sub('', match.group('whole')) + '.' + (match.group('fraction') or '0'))
+    suffix = match.group('suffix')
+    return int(round(number * (MULTIPLIERS[suffix.lower()] if suffix else 1)))
+
+def parse_counts(texts, label=None):
+    """Vectorized parse_count over a pandas Series (or any sequence) of raw strings.
+
+    Returns a nullable Int64 Series aligned with the input; unparseable
+    entries are <NA>. Each distinct string is parsed once, since scraped
+    snippets repeat heavily ("1.2M", "10K Followers").
+    """
+    texts = pd.Series(texts, dtype='object')
+    codes, uniques = pd.factorize(texts)
+    parts = pd.Series(uniques, dtype='string').str.extract(count_pattern(label))
+    whole = parts['whole'].str.replace(SEPARATOR_RE.pattern, '', regex=True)
+    number = pd.to_numeric(whole + '.' + parts['fraction'].fillna('0'), errors='coerce')
+    multiplier = parts['suffix'].str.lower().map(MULTIPLIERS).fillna(1).astype('float64')
+    counts = (number * multiplier).round().astype('Int64')
+    return pd.Series(counts.array.take(codes, allow_fill=True), index=texts.index)
@@ -0,0 +1,219 @@
+import os
+import copy
+import json
+import atexit
+import shutil
+import tempfile
+import threading
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.driver_finder import DriverFinder
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Where the resolved chromedriver path is remembered between runs
+DRIVER_PATH_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'socialscraper', 'chromedriver.json')
+# Throwaway Chrome profiles for headless sessions, one per session
+PROFILE_ROOT = os.path.join(tempfile.gettempdir(), 'socialscraper-profiles')
+
+# Server profile: no window or X server, a smaller viewport, at most two
+# renderer processes and none of Chrome's background services
+HEADLESS_WINDOW_SIZE = '1024,768'
+HEADLESS_ARGUMENTS = [
+    '--headless=new',
+    '--renderer-process-limit=2',
+    '--disable-features=site-per-process,Translate,MediaRouter,OptimizationHints',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--no-first-run',
+    '--mute-audio',
+    '--blink-settings=imagesEnabled=false',
+]
+
+_lock = threading.Lock()
+_driver_path = None
+_idle_drivers = {}  # options key -> list of warm drivers
+_driver_keys = {}  # id(driver) -> options key
+_profile_dirs = {}  # id(driver) -> disposable profile directory
+
+
+def _load_cached_path():
+    try:
+        with open(DRIVER_PATH_CACHE) as f:
+            path = json.load(f).get('path')
+        if path and os.path.isfile(path):
+            return path
+    except Exception:
+        pass
+    return None
+
+def _save_cached_path(path):
+    try:
+        os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+        with open(DRIVER_PATH_CACHE, 'w') as f:
+            json.dump({'path': path}, f)
+    except Exception as e:
+        print(f"Could not cache chromedriver path: {str(e)}")
+
+def resolve_driver_path(refresh=False):
+    """Find the chromedriver binary once per machine and cache its path on disk."""
+    global _driver_path
+    with _lock:
+        if _driver_path and not refresh:
+            return _driver_path
+
+        path = None if refresh else _load_cached_path()
+        if path is None:
+            try:
+                path = DriverFinder.get_path(Service(), webdriver.ChromeOptions())
+            except Exception as e:
+                print(f"Error with default service, trying ChromeDriverManager: {str(e)}")
+                try:
+                    path = ChromeDriverManager().install()
+                except Exception as e:
+                    print(f"Error with ChromeDriverManager: {str(e)}")
+                    # Try one more time with default Chrome location
+                    path = os.path.abspath("chromedriver.exe")
+            if os.path.isfile(path):
+                _save_cached_path(path)
+
+        _driver_path = path
+        return path
+
+def apply_headless_profile(options):
+    """Add the low-memory headless flags to options built without a window size."""
+    options.add_argument(f'--window-size={HEADLESS_WINDOW_SIZE}')
+    for argument in HEADLESS_ARGUMENTS:
+        options.add_argument(argument)
+    return options
+
+def _options_key(options):
+    return (
+        tuple(options.arguments),
+        json.dumps(options.experimental_options, sort_keys=True, default=str),
+        options.page_load_strategy,
+    )
+
+def create_driver(options, disposable_profile=False):
+    """Start a new Chrome session using the cached chromedriver path.
+
+    With disposable_profile the session gets its own user data directory
+    under PROFILE_ROOT, deleted again when the session is quit.
+    """
+    key = _options_key(options)
+    profile_dir = None
+    if disposable_profile:
+        os.makedirs(PROFILE_ROOT, exist_ok=True)
+        profile_dir = tempfile.mkdtemp(prefix='chrome-', dir=PROFILE_ROOT)
+        # Keep the directory out of the options the pool is keyed on
+        options = copy.deepcopy(options)
+        options.add_argument(f'--user-data-dir={profile_dir}')
+
+    try:
+        try:
+            driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=options)
+        except Exception as e:
+            # The cached binary may be stale after a Chrome upgrade, resolve it again
+            print(f"Error starting Chrome with cached driver, resolving again: {str(e)}")
+            driver = webdriver.Chrome(service=Service(resolve_driver_path(refresh=True)), options=options)
+    except Exception:
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        raise
+
+    with _lock:
+        _driver_keys[id(driver)] = key
+        if profile_dir:
+            _profile_dirs[id(driver)] = profile_dir
+    return driver
+
+def _is_alive(driver):
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+def _quit(driver):
+    with _lock:
+        _driver_keys.pop(id(driver), None)
+        profile_dir = _profile_dirs.pop(id(driver), None)
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    if profile_dir:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+def discard_driver(driver):
+    """Quit a session that must not be reused (e.g. it crashed) and delete its disposable profile."""
+    _quit(driver)
+
+def acquire_driver(options, disposable_profile=False):
+    """Hand out a warm idle session started with the same options, or start a new one."""
+    key = _options_key(options)
+    while True:
+        with _lock:
+            idle = _idle_drivers.get(key)
+            driver = idle.pop() if idle else None
+        if driver is None:
+            break
+        if _is_alive(driver):
+            return driver
+        _quit(driver)
+
+    return create_driver(options, disposable_profile)
+
+def release_driver(driver):
+    """Reset a session and park it so the next acquire_driver call can reuse it."""
+    with _lock:
+        key = _driver_keys.get(id(driver))
+    if key is None:
+        _quit(driver)
+        return
+
+    try:
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+    except Exception:
+        _quit(driver)
+        return
+
+    with _lock:
+        _idle_drivers.setdefault(key, []).append(driver)
+
+def prewarm_drivers(options, count, disposable_profile=False):
+    """Start up to count sessions in parallel and park them as idle, ready for acquire_driver."""
+    key = _options_key(options)
+    with _lock:
+        missing = count - len(_idle_drivers.get(key, []))
+
+    def start():
+        try:
+            release_driver(create_driver(options, disposable_profile))
+        except Exception as e:
+            print(f"Could not prewarm Chrome driver: {str(e)}")
+
+    threads = [threading.Thread(target=start, daemon=True) for _ in range(max(0, missing))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def shutdown_drivers():
+    """Quit every idle session and delete profiles left behind by sessions quit elsewhere."""
+    with _lock:
+        drivers = [driver for idle in _idle_drivers.values() for driver in idle]
+        _idle_drivers.clear()
+    for driver in drivers:
+        _quit(driver)
+    with _lock:
+        profile_dirs = list(_profile_dirs.values())
+        _profile_dirs.clear()
+    for profile_dir in profile_dirs:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+atexit.register(shutdown_drivers)
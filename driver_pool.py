@@ -0,0 +1,88 @@
+import os
+import threading
+
+from retry_scheduler import RetryQueue, classify_error, backoff_delay, PERMANENT, CRASHED
+
+
+def default_pool_size():
+    """Pick a worker count that fits the host: roughly one Chrome per two cores."""
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
+
+def run_driver_pool(items, create_driver, work, workers=1, release_driver=None,
+                    max_attempts=1, on_failure=None, discard_driver=None):
+    """Process items across a pool of WebDriver workers.
+
+    Each worker owns one driver and pulls (index, item) pairs from a shared
+    queue until it is empty. work(driver, index, item) makes one attempt and
+    raises on failure; retryable failures are put back on the queue with
+    exponential backoff while the worker moves on to other items. Permanent
+    failures, or items out of attempts, are handed to on_failure(index, item,
+    error, kind) whose return value becomes the item's result.
+
+    When the queue is drained the driver is handed to release_driver (or quit
+    if none is given); a session that crashed is handed to discard_driver (or
+    quit). Results are returned in input order; items that could
+    not be processed are left as None.
+    """
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    work_queue = RetryQueue()
+    for index, item in enumerate(items):
+        work_queue.put(index, item)
+
+    def worker(worker_id):
+        driver = None
+        try:
+            print(f"[worker {worker_id}] Initializing Chrome driver...")
+            driver = create_driver()
+            while True:
+                task = work_queue.get()
+                if task is None:
+                    return
+                index, item, attempt = task
+                try:
+                    results[index] = work(driver, index, item)
+                except Exception as e:
+                    kind = classify_error(e)
+                    if kind not in PERMANENT and attempt + 1 < max_attempts:
+                        delay = backoff_delay(attempt, kind)
+                        print(f"[worker {worker_id}] {item}: {kind} ({str(e).strip()[:200]}), "
+                              f"retrying in {delay:.1f}s (attempt {attempt + 2}/{max_attempts})")
+                        work_queue.put(index, item, attempt + 1, delay)
+                    else:
+                        print(f"[worker {worker_id}] Giving up on {item} after {attempt + 1} attempts: {kind}")
+                        if on_failure:
+                            results[index] = on_failure(index, item, e, kind)
+                    if kind == CRASHED:
+                        print(f"[worker {worker_id}] Browser session died, starting a new one")
+                        try:
+                            if discard_driver:
+                                discard_driver(driver)
+                            else:
+                                driver.quit()
+                        except Exception:
+                            pass
+                        driver = None
+                        driver = create_driver()
+                finally:
+                    work_queue.task_done()
+        except Exception as e:
+            print(f"[worker {worker_id}] Could not start Chrome driver: {str(e)}")
+        finally:
+            if driver:
+                if release_driver:
+                    release_driver(driver)
+                else:
+                    driver.quit()
+
+    workers = max(1, min(workers, len(items)))
+    threads = [threading.Thread(target=worker, args=(worker_id,), daemon=True)
+               for worker_id in range(1, workers + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
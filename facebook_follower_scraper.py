@@ -1,6 +1,5 @@
 import sys
 import subprocess
-import datetime
 import pandas as pd
 
 def install_requirements():
@@ -27,60 +26,39 @@ if __name__ == '__main__':
 # Now import all required packages
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 import time
 import random
-import requests
-import json
-import re
+import argparse
 
-# Airtable configuration
-AIRTABLE_PAT = "patC3CJ296jcbbAMd.e12065cdff24c5b8e6ed1e9315fa4f5a9233ee9803efd602a7a2a74ff14c5057"
-AIRTABLE_BASE_ID = "appdeZcAttBaG5oVI"
-AIRTABLE_TABLE_NAME = "Politicians"
+from retry_scheduler import ScrapeError, check_page, MISSING, RATE_LIMITED
+from driver_factory import acquire_driver, apply_headless_profile
+from airtable_client import iter_airtable_pages, not_blank_formula, update_records, WRITE_BATCH_SIZE
+from http_fetch import meta_content
+from checkpoint import Checkpoint, JournaledWriter, checkpoint_path
+from handles import ScrapePlan
+from change_filter import ChangeFilter
+from resource_blocking import configure_options, apply_blocking, DEFAULT_PAGE_LOAD_STRATEGY
+from scrape_args import add_browser_arguments, browser_kwargs
+from scrape_run import scrape_counts, plan_page
+from count_parser import parse_count, count_pattern, FOLLOWERS_LABEL
+from page_extract import strategies_js, extract_in_page
+from page_ready import wait_until_ready, ready_js
+
+PLATFORM = 'facebook'
 
 def wait_random():
     time.sleep(random.uniform(1, 2))  # Slightly longer wait for Facebook
 
-def parse_follower_count(text):
-    try:
-        # Remove any non-numeric characters except commas, decimal points, and K/M/B
-        text = text.strip()
-        # Extract just the number part
-        number_match = re.search(r'([\d,\.]+\s*[KMBkmb]?)\s*(?:people follow this|followers?)?', text, re.IGNORECASE)
-        if number_match:
-            number_str = number_match.group(1).strip()
-            
-            # Handle K, M, B suffixes
-            multiplier = 1
-            if number_str[-1].upper() == 'K':
-                multiplier = 1000
-                number_str = number_str[:-1]
-            elif number_str[-1].upper() == 'M':
-                multiplier = 1000000
-                number_str = number_str[:-1]
-            elif number_str[-1].upper() == 'B':
-                multiplier = 1000000000
-                number_str = number_str[:-1]
-            
-            # Remove commas and convert to float
-            number_str = number_str.replace(',', '')
-            return float(number_str) * multiplier
-    except Exception as e:
-        print(f"Error parsing follower count '{text}': {str(e)}")
-    return None
-
-def get_follower_counts(usernames, max_retries=2):
+def build_chrome_options(page_load_strategy=DEFAULT_PAGE_LOAD_STRATEGY, headless=False, network_stats=False):
     # Setup Chrome options
     options = webdriver.ChromeOptions()
     options.add_argument('--disable-gpu')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
+    if headless:
+        apply_headless_profile(options)
+    else:
+        options.add_argument('--window-size=1920,1080')
     options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
     # Add these options to suppress WebGL warnings
     options.add_argument('--disable-software-rasterizer')
@@ -89,217 +67,193 @@ def get_follower_counts(usernames, max_retries=2):
     # Suppress logging
     options.add_experimental_option('excludeSwitches', ['enable-logging'])
     
-    results = []
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    driver = None
-    total_users = len(usernames)
-    
-    try:
-        print("Initializing Chrome driver...")
-        try:
-            service = Service()
-            driver = webdriver.Chrome(service=service, options=options)
-        except Exception as e:
-            print(f"Error with default service, trying ChromeDriverManager: {str(e)}")
-            try:
-                service = Service(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=service, options=options)
-            except Exception as e:
-                print(f"Error with ChromeDriverManager: {str(e)}")
-                service = Service("chromedriver.exe")
-                driver = webdriver.Chrome(service=service, options=options)
+    return configure_options(options, page_load_strategy, network_stats)
 
-        for index, username in enumerate(usernames, 1):
-            if not username:
-                continue
-                
-            retries = 0
-            follower_count = None
-            error_message = None
-            
-            while retries < max_retries and follower_count is None:
-                try:
-                    print(f"\n{index}/{total_users} @{username} (Attempt {retries + 1}/{max_retries})")
-                    url = f"https://www.facebook.com/{username}"
-                    driver.get(url)
-                    wait_random()
-                    
-                    # Wait for and close the login popup if it appears
-                    try:
-                        wait = WebDriverWait(driver, 5)
-                        close_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'div[aria-label="Close"]')))
-                        close_button.click()
-                        print("Closed login popup")
-                        wait_random()
-                    except:
-                        print("No login popup found or couldn't close it")
-                    
-                    # Try to find follower count using multiple possible selectors
-                    wait = WebDriverWait(driver, 10)
-                    
-                    # List of possible selectors for follower count
-                    selectors = [
-                        "a[href*='followers'] span",
-                        "a[href*='followers']",
-                        "div[role='main'] span:contains('followers')",
-                        "div[role='main'] span:contains('people follow')"
-                    ]
-                    
-                    for selector in selectors:
-                        try:
-                            element = driver.find_element(By.CSS_SELECTOR, selector)
-                            follower_text = element.text
-                            print(f"Found text: {follower_text}")
-                            follower_count = parse_follower_count(follower_text)
-                            if follower_count is not None:
-                                break
-                        except:
-                            continue
-                    
-                    if follower_count is None:
-                        error_message = "Could not find or parse follower count"
-                        retries += 1
-                        if retries < max_retries:
-                            print(f"Retrying... ({retries}/{max_retries})")
-                            wait_random()
-                        
-                except TimeoutException as e:
-                    error_message = f"Timeout: {str(e)}"
-                    print(f"Timeout while processing {username}")
-                    retries += 1
-                    if retries < max_retries:
-                        print(f"Retrying... ({retries}/{max_retries})")
-                        wait_random()
-                except Exception as e:
-                    error_message = str(e)
-                    print(f"Error processing {username}: {str(e)}")
-                    retries += 1
-                    if retries < max_retries:
-                        print(f"Retrying... ({retries}/{max_retries})")
-                        wait_random()
-            
-            # Add result whether successful or not
-            results.append({
-                'username': username,
-                'follower_count': follower_count,
-                'timestamp': timestamp,
-                'error': error_message if follower_count is None else None
-            })
-            
-            if follower_count is not None:
-                print(f"Successfully retrieved follower count for {username}: {follower_count:,.0f}")
-            else:
-                print(f"Failed to process {username} after {max_retries} attempts: {error_message}")
-            
-            wait_random()
-            
-    except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-    finally:
-        if driver:
-            driver.quit()
-            
-    return results
+def create_driver(page_load_strategy=DEFAULT_PAGE_LOAD_STRATEGY, block_resources=True, headless=False,
+                  network_stats=False):
+    """Get a warm Chrome session from the shared driver factory."""
+    driver = acquire_driver(build_chrome_options(page_load_strategy, headless, network_stats),
+                            disposable_profile=headless)
+    apply_blocking(driver, PLATFORM, block_resources)
+    return driver
 
-def get_airtable_records():
-    """Fetch records from Airtable."""
-    headers = {
-        'Authorization': f'Bearer {AIRTABLE_PAT}',
-        'Content-Type': 'application/json',
-    }
+# Page text that means the handle will never resolve, or that Facebook is throttling us
+NOT_FOUND_MARKERS = ["This content isn't available", "This page isn't available"]
+RATE_LIMIT_MARKERS = ["You're Temporarily Blocked", 'You’re Temporarily Blocked']
+
+READY_JS = ready_js(selectors=["a[href*='followers']", 'div[aria-label="Close"]'],
+                    markers=NOT_FOUND_MARKERS + RATE_LIMIT_MARKERS, url_parts=['/login'])
+READY_TIMEOUT = 10
+
+# Possible places for the follower count, looked up by a single in-page script.
+# The :contains() names were never valid CSS; they now do what they describe.
+EXTRACT_STRATEGIES = {
+    "a[href*='followers'] span": r"""textOf(document.querySelector("a[href*='followers'] span")) || null""",
+    "a[href*='followers']": r"""textOf(document.querySelector("a[href*='followers']")) || null""",
+    "div[role='main'] span:contains('followers')": r"""firstWith("div[role='main'] span", /followers/i)""",
+    "div[role='main'] span:contains('people follow')": r"""firstWith("div[role='main'] span", /people follow/i)""",
+}
+EXTRACT_JS = strategies_js(EXTRACT_STRATEGIES)
+
+def scrape_profile(driver, index, username, total_users, timestamp):
+    """Make one attempt at the follower count; raises ScrapeError when it cannot be read."""
+    if not username:
+        return None
+    
+    print(f"\n{index}/{total_users} @{username}")
+    url = f"https://www.facebook.com/{username}"
+    start = time.perf_counter()
+    driver.get(url)
+    # Wait for the follower link or the login popup instead of sleeping (old cost: wait_random)
+    wait_until_ready(driver, PLATFORM, READY_JS, READY_TIMEOUT, replaced_sleep=1.5)
+    fetch_time = time.perf_counter() - start
+    
+    # Close the login popup if it is showing; no more fixed 5s wait when it never appears
+    try:
+        close_buttons = driver.find_elements(By.CSS_SELECTOR, 'div[aria-label="Close"]')
+        if close_buttons:
+            close_buttons[0].click()
+            print("Closed login popup")
+    except:
+        print("Couldn't close login popup")
+    
+    # All selectors in one round trip, historically cheapest first
+    follower_count, raw_text, method = extract_in_page(driver, PLATFORM, EXTRACT_JS, EXTRACT_STRATEGIES, parse_count)
+    if follower_count is not None:
+        print(f"Found text with {method}: {raw_text}")
+    
+    if follower_count is None:
+        # A login wall is temporary, so it is retried like a rate limit
+        if '/login' in driver.current_url:
+            raise ScrapeError(RATE_LIMITED, "Redirected to login")
+        check_page(driver, NOT_FOUND_MARKERS, RATE_LIMIT_MARKERS)
+        raise ScrapeError(MISSING, "Could not find or parse follower count")
     
-    url = f'https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}'
-    response = requests.get(url, headers=headers)
+    print(f"Successfully retrieved follower count for {username}: {follower_count:,.0f}")
+    wait_random()
     
-    if response.status_code == 200:
-        records = response.json().get('records', [])
-        return [{
+    return {
+        'username': username,
+        'follower_count': follower_count,
+        'timestamp': timestamp,
+        'error': None,
+        'raw_text': raw_text,
+        'method': method,
+        'fetch_time': round(fetch_time, 3)
+    }
+
+# Follower text in the page description, e.g. "12K followers" or "1,234 people follow this"
+FOLLOWER_TEXT_PATTERN = count_pattern(FOLLOWERS_LABEL)
+
+def extract_from_html(soup):
+    """Read the follower count from the description meta tags of a public page.
+
+    Returns (count, raw_text, method) or (None, None, None).
+    """
+    content = meta_content(soup, 'og:description', 'description')
+    if content:
+        match = FOLLOWER_TEXT_PATTERN.search(content)
+        if match:
+            count = parse_count(match.group(0))
+            if count is not None:
+                return count, match.group(0), 'meta-description'
+    return None, None, None
+
+def extract_count_from_html(soup):
+    """Just the count from extract_from_html."""
+    return extract_from_html(soup)[0]
+
+def get_follower_counts(usernames, max_retries=2, **kwargs):
+    """Scrape follower counts for usernames, over plain HTTP first; see scrape_run.scrape_counts."""
+    return scrape_counts(PLATFORM, usernames, scrape_profile, build_chrome_options, create_driver,
+                         extract_from_html, max_retries=max_retries, **kwargs)
+
+def iter_airtable_records():
+    """Yield pages of records, with the count Airtable holds now, as they arrive."""
+    for page in iter_airtable_pages(fields=['facebook_user', 'facebook_followers'], formula=not_blank_formula('facebook_user')):
+        yield [{
             'id': record['id'],
             'facebook_user': record.get('fields', {}).get('facebook_user', ''),
-        } for record in records if record.get('fields', {}).get('facebook_user')]
-    else:
-        print(f"Error fetching Airtable records: {response.status_code}")
-        return []
+            'facebook_followers': record.get('fields', {}).get('facebook_followers'),
+        } for record in page if record.get('fields', {}).get('facebook_user')]
 
 def update_airtable_batch(updates):
-    """Update multiple records in Airtable in a single request."""
+    """Update multiple records in Airtable; returns one success flag per update."""
     if not updates:
         return True
-        
-    headers = {
-        'Authorization': f'Bearer {AIRTABLE_PAT}',
-        'Content-Type': 'application/json',
-    }
-    
-    url = f'https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}'
-    
-    # Process updates in batches of 10
-    batch_size = 10
-    success = True
-    
-    for i in range(0, len(updates), batch_size):
-        batch = updates[i:i + batch_size]
-        
-        # Prepare the records for batch update
-        payload = {
-            'records': [{
-                'id': update['id'],
-                'fields': {
-                    'facebook_followers': update['follower_count']
-                }
-            } for update in batch]
+    return update_records([{
+        'id': update['id'],
+        'fields': {
+            'facebook_followers': update['follower_count']
         }
-        
-        response = requests.patch(url, headers=headers, json=payload)
-        
-        if response.status_code == 200:
-            print(f"Successfully updated batch of {len(batch)} records in Airtable")
-        else:
-            print(f"Error updating Airtable records: {response.status_code}")
-            print(response.text)
-            success = False
-            
-    return success
+    } for update in updates])
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Facebook follower counts into Airtable")
+    add_browser_arguments(parser)
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the last run from its checkpoint and replay unwritten updates")
+    parser.add_argument('--checkpoint', default=checkpoint_path(PLATFORM), help="Checkpoint journal file")
+    args = parser.parse_args()
+    
     print("Fetching Facebook usernames from Airtable...")
-    airtable_records = get_airtable_records()
+    airtable_records = []
+    plan = ScrapePlan(PLATFORM)
+    changes = ChangeFilter(args.min_delta)
+    results = []
+    
+    # Results are journaled and written to Airtable, several batches of 10 at a time, while scraping continues
+    checkpoint = Checkpoint(args.checkpoint, resume=args.resume)
+    writer = JournaledWriter(update_airtable_batch, checkpoint, key=lambda update: update['id'],
+                             batch_size=WRITE_BATCH_SIZE).start()
+    
+    def queue_update(data, record_ids=None):
+        if data['follower_count'] is None:
+            return
+        # Every record that lists this handle gets the count
+        for record_id in record_ids or plan.record_ids(data['username']):
+            if not changes.should_write(record_id, 'facebook_followers', data['follower_count']):
+                continue
+            writer.put({
+                'id': record_id,
+                'follower_count': data['follower_count'],
+                'timestamp': data['timestamp']
+            })
+    
+    def on_result(data):
+        plan.record_result(data)
+        queue_update(data)
+        checkpoint.record_result(PLATFORM, data)
+    
+    # Start scraping each page of records as soon as it arrives
+    try:
+        for page in iter_airtable_records():
+            airtable_records.extend(page)
+            print(f"Fetched {len(page)} Facebook usernames ({len(airtable_records)} so far)")
+            rows = [(record['id'], record['facebook_user'], record['facebook_followers']) for record in page]
+            usernames, done = plan_page(PLATFORM, rows, plan, changes, checkpoint, queue_update)
+            results.extend(done)
+            results.extend(get_follower_counts(usernames, on_result=on_result,
+                                               **browser_kwargs(args, PLATFORM)))
+    except Exception as e:
+        print(f"Error fetching Airtable records: {str(e)}")
+    
+    # Flush the last partial batch
+    success_count = writer.close()
+    checkpoint.close()
     
     if not airtable_records:
         print("No Facebook usernames found in Airtable")
         sys.exit(1)
         
     print(f"Found {len(airtable_records)} Facebook usernames")
-    
-    # Get follower counts
-    usernames = [record['facebook_user'] for record in airtable_records]
-    results = get_follower_counts(usernames)
+    plan.report()
+    changes.report()
     
     if not results:
         print("No follower data retrieved")
         sys.exit(1)
         
-    # Prepare updates for Airtable
-    updates = []
-    success_count = 0
-    
-    for data in results:
-        for record in airtable_records:
-            if record['facebook_user'] == data['username']:
-                if data['follower_count'] is not None:
-                    updates.append({
-                        'id': record['id'],
-                        'follower_count': data['follower_count'],
-                        'timestamp': data['timestamp']
-                    })
-                break
-    
-    # Update Airtable in batches
-    if updates:
-        print(f"Updating {len(updates)} records in Airtable...")
-        if update_airtable_batch(updates):
-            success_count = len(updates)
-    
     # Separate successful and failed results
     successful_results = []
     failed_results = []
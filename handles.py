@@ -0,0 +1,104 @@
+import re
+import threading
+from urllib.parse import urlsplit, parse_qs
+
+from platforms import PLATFORMS
+from record_index import RecordIndex
+
+SCHEME_RE = re.compile(r'^[a-z][a-z0-9+.-]*://')
+
+
+def canonical_handle(platform, raw):
+    """Canonical handle for what was typed into Airtable, or None if it is not a valid one.
+
+    '@Name', 'name/', 'https://www.instagram.com/name/?hl=en' and
+    'youtube.com/c/Name' all become 'name'. Links to posts, videos and
+    site pages (instagram.com/p/..., youtube.com/channel/...) are not
+    handles; facebook.com/pages/Name/123 becomes 'profile.php?id=123'.
+    """
+    config = PLATFORMS[platform]
+    handle = (raw or '').strip().lower()
+    has_scheme = bool(SCHEME_RE.match(handle))
+    url = urlsplit(handle if has_scheme else '//' + handle)
+    host = url.netloc.split(':')[0]
+    on_platform = any(host == domain or host.endswith('.' + domain) for domain in config['domains'])
+
+    if on_platform:
+        if host in config['link_domains']:
+            return None  # A short link to a video or post
+        parts = [part for part in url.path.split('/') if part]
+        if url.path.strip('/') == 'profile.php' and parse_qs(url.query).get('id'):
+            handle = f"profile.php?id={parse_qs(url.query)['id'][0]}"
+        elif len(parts) > 1 and parts[0] in config['id_paths'] and parts[-1].isdigit():
+            handle = f"profile.php?id={parts[-1]}"
+        else:
+            if parts and parts[0] in config['path_prefixes']:
+                parts = parts[1:]
+            handle = parts[0] if parts else ''
+    elif has_scheme:
+        return None  # A link to some other site
+    else:
+        handle = re.split(r'[/#]|\?(?!id=)', handle)[0]
+
+    handle = handle.lstrip('@')
+    if handle in config['reserved_paths'] or not re.fullmatch(config['handle_pattern'], handle):
+        return None
+    return handle
+
+class ScrapePlan:
+    """Pre-scrape plan for one platform: every canonical handle is fetched once.
+
+    add_page() indexes a page of (record_id, raw handle) pairs and returns the
+    handles no earlier page asked for, plus (record_id, result) pairs for
+    records that repeat a handle an earlier page already fetched. Results
+    must be passed to record_result() for those to be found.
+    """
+
+    def __init__(self, platform):
+        self.platform = platform
+        self.index = RecordIndex(key=lambda handle: canonical_handle(platform, handle))
+        self.rows = 0
+        self.invalid = []  # (record_id, raw handle)
+        self.planned = set()
+        self._results = {}  # handle -> successful result
+        self._lock = threading.Lock()
+
+    def add_page(self, pairs):
+        """Returns (handles to fetch, (record_id, result) pairs already answered)."""
+        handles = []
+        answered = []
+        for record_id, raw in pairs:
+            self.rows += 1
+            handle = canonical_handle(self.platform, raw)
+            if handle is None:
+                self.invalid.append((record_id, raw))
+                continue
+            self.index.add(record_id, handle)
+            if handle not in self.planned:
+                self.planned.add(handle)
+                handles.append(handle)
+                continue
+            with self._lock:
+                result = self._results.get(handle)
+            if result is not None:
+                answered.append((record_id, result))
+        return handles, answered
+
+    def record_result(self, result):
+        if result.get('follower_count') is not None:
+            with self._lock:
+                self._results[result['username']] = result
+
+    def record_ids(self, handle):
+        return self.index.record_ids(handle)
+
+    @property
+    def saved(self):
+        """Page loads saved by collapsing duplicate handles."""
+        return self.rows - len(self.invalid) - len(self.planned)
+
+    def report(self):
+        print(f"\n{self.platform}: {self.rows} handles in Airtable, {len(self.planned)} distinct profiles to fetch, "
+              f"{self.saved} page loads saved by de-duplication, {len(self.invalid)} invalid handles skipped")
+        for record_id, raw in self.invalid:
+            print(f"  Invalid handle {raw!r} on record {record_id}")
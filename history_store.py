@@ -0,0 +1,185 @@
+import os
+import time
+import sqlite3
+import argparse
+import threading
+
+import pandas as pd
+
+# Every follower count ever scraped, kept locally for growth tracking
+HISTORY_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'socialscraper', 'history.sqlite3')
+
+_history = None
+_history_lock = threading.Lock()
+
+
+class HistoryStore:
+    """Append-only time series of follower counts, keyed by (platform, handle, time).
+
+    Handles are stored once in a dictionary table and counts as three
+    integers (handle id, unix seconds, count) in a table clustered on
+    (handle_id, scraped_at). A query for some handles or a time window
+    reads only those handles' rows instead of scanning the whole history.
+    Query results are DataFrames with nullable Int64 counts and UTC times.
+    """
+
+    def __init__(self, path=HISTORY_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._handle_ids = {}  # (platform, handle) -> id
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS handles (
+                id INTEGER PRIMARY KEY,
+                platform TEXT NOT NULL,
+                handle TEXT NOT NULL,
+                UNIQUE (platform, handle)
+            );
+            CREATE TABLE IF NOT EXISTS counts (
+                handle_id INTEGER NOT NULL,
+                scraped_at INTEGER NOT NULL,
+                follower_count INTEGER NOT NULL,
+                PRIMARY KEY (handle_id, scraped_at)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+
+    def _handle_id(self, platform, handle):
+        key = (platform, handle.lower())
+        if key not in self._handle_ids:
+            self._conn.execute("INSERT OR IGNORE INTO handles (platform, handle) VALUES (?, ?)", key)
+            self._handle_ids[key] = self._conn.execute(
+                "SELECT id FROM handles WHERE platform = ? AND handle = ?", key).fetchone()[0]
+        return self._handle_ids[key]
+
+    def append(self, platform, results, scraped_at=None):
+        """Append the successful results; returns how many were stored."""
+        scraped_at = int(scraped_at or time.time())
+        with self._lock:
+            rows = [(self._handle_id(platform, result['username']), scraped_at, int(result['follower_count']))
+                    for result in results if result.get('follower_count') is not None]
+            # A second count for a handle within the same second is a repeat, not new history
+            self._conn.executemany("INSERT OR IGNORE INTO counts VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    def _handle_filter(self, platform=None, handles=None):
+        conditions, params = [], []
+        if platform:
+            conditions.append("h.platform = ?")
+            params.append(platform)
+        if handles:
+            conditions.append(f"h.handle IN ({', '.join('?' * len(handles))})")
+            params.extend(handle.lower() for handle in handles)
+        return conditions, params
+
+    def _query(self, sql, params):
+        with self._lock:
+            frame = pd.read_sql_query(sql, self._conn, params=params)
+        for column in frame.columns:
+            if column.endswith('_at'):
+                frame[column] = pd.to_datetime(frame[column], unit='s')
+            elif column.endswith('count'):
+                frame[column] = frame[column].astype('Int64')
+        if 'platform' in frame:
+            frame['platform'] = frame['platform'].astype('category')
+        return frame
+
+    def history(self, platform=None, handles=None, since=None, until=None):
+        """Every stored count for the matching handles, oldest first."""
+        conditions, params = self._handle_filter(platform, handles)
+        for column, operator, value in [('c.scraped_at', '>=', since), ('c.scraped_at', '<=', until)]:
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(_unix(value))
+        sql = ("SELECT h.platform, h.handle, c.scraped_at, c.follower_count "
+               "FROM handles h JOIN counts c ON c.handle_id = h.id")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return self._query(sql + " ORDER BY h.platform, h.handle, c.scraped_at", params)
+
+    def latest(self, platform=None, handles=None):
+        """The most recent count of every matching handle."""
+        conditions, params = self._handle_filter(platform, handles)
+        sql = ("SELECT h.platform, h.handle, c.scraped_at, c.follower_count FROM handles h "
+               "JOIN counts c ON c.handle_id = h.id "
+               "AND c.scraped_at = (SELECT MAX(scraped_at) FROM counts WHERE handle_id = h.id)")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return self._query(sql + " ORDER BY h.platform, h.handle", params)
+
+    def growth(self, platform=None, handles=None, since=None, until=None):
+        """First and last count of every matching handle within [since, until], and the growth between them.
+
+        Returns one row per handle with at least one count in the window:
+        first/last counts and times, change, pct_change and change per day.
+        """
+        conditions, params = self._handle_filter(platform, handles)
+        for operator, value in [('>=', since), ('<=', until)]:
+            if value is not None:
+                conditions.append(f"c.scraped_at {operator} ?")
+                params.append(_unix(value))
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        # SQLite fills the bare follower_count from the row MIN()/MAX() picked
+        sql = ("SELECT h.platform, h.handle, {agg}(c.scraped_at) AS {name}_at, c.follower_count AS {name}_count "
+               "FROM handles h JOIN counts c ON c.handle_id = h.id" + where + " GROUP BY h.id")
+        first = self._query(sql.format(agg='MIN', name='first'), params)
+        last = self._query(sql.format(agg='MAX', name='last'), params)
+        growth = first.merge(last, on=['platform', 'handle'])
+        growth['change'] = growth['last_count'] - growth['first_count']
+        growth['pct_change'] = (growth['change'] / growth['first_count'].replace(0, pd.NA)).astype('Float64') * 100
+        days = (growth['last_at'] - growth['first_at']).dt.total_seconds() / 86400
+        growth['per_day'] = (growth['change'] / days.where(days > 0)).astype('Float64')
+        return growth.sort_values(['platform', 'change'], ascending=[True, False], ignore_index=True)
+
+def _unix(value):
+    """Unix seconds for a number, datetime or string; naive times are UTC."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(pd.Timestamp(value).timestamp())
+
+def get_history():
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = HistoryStore()
+        return _history
+
+def record_history(platform, result):
+    """Append one fresh scrape result to the local history; never fails the scrape."""
+    try:
+        get_history().append(platform, [result])
+    except Exception as e:
+        print(f"Could not record {platform} history: {str(e)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the local follower count history")
+    parser.add_argument('--path', default=HISTORY_PATH, help="History database file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    latest_parser = commands.add_parser('latest', help="Most recent count of every handle")
+    latest_parser.add_argument('--platform')
+    latest_parser.add_argument('handles', nargs='*')
+
+    history_parser = commands.add_parser('history', help="Every stored count of some handles")
+    history_parser.add_argument('--platform')
+    history_parser.add_argument('handles', nargs='+')
+
+    growth_parser = commands.add_parser('growth', help="Growth of every handle over the last days")
+    growth_parser.add_argument('--platform')
+    growth_parser.add_argument('--days', type=float, default=30)
+    growth_parser.add_argument('--top', type=int, default=20, help="Show only the fastest growing handles")
+    growth_parser.add_argument('handles', nargs='*')
+
+    args = parser.parse_args()
+    store = HistoryStore(args.path)
+
+    with pd.option_context('display.max_rows', None, 'display.width', 160):
+        if args.command == 'latest':
+            print(store.latest(args.platform, args.handles).to_string(index=False))
+        elif args.command == 'history':
+            print(store.history(args.platform, args.handles).to_string(index=False))
+        else:
+            growth = store.growth(args.platform, args.handles, since=time.time() - args.days * 86400)
+            print(growth.groupby('platform', observed=True).head(args.top).to_string(index=False))
@@ -0,0 +1,106 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+HTTP_WORKERS = 8  # Concurrent plain-HTTP fetches in the fast tier
+HTTP_TIMEOUT = 10
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the shared keep-alive session used for plain-HTTP profile fetches."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=HTTP_WORKERS * 2)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+            _session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Accept-Language': 'en-US,en;q=0.9',
+            })
+        return _session
+
+def fetch_soup(url, timeout=HTTP_TIMEOUT):
+    """Fetch a page without a browser and parse it, or return None if the page is not usable."""
+    try:
+        response = get_session().get(url, timeout=timeout)
+        if response.status_code != 200:
+            return None
+        return BeautifulSoup(response.text, 'html.parser')
+    except Exception as e:
+        print(f"HTTP fetch failed for {url}: {str(e)}")
+        return None
+
+def meta_content(soup, *names):
+    """Return the content of the first matching <meta property=...> or <meta name=...> tag."""
+    for name in names:
+        tag = soup.find('meta', attrs={'property': name}) or soup.find('meta', attrs={'name': name})
+        if tag and tag.get('content'):
+            return tag['content']
+    return None
+
+class TierStats:
+    """Thread-safe hit counters for each fetch tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.attempts = {}
+        self.hits = {}
+
+    def record(self, tier, hit):
+        with self._lock:
+            self.attempts[tier] = self.attempts.get(tier, 0) + 1
+            if hit:
+                self.hits[tier] = self.hits.get(tier, 0) + 1
+
+    def report(self):
+        print("\nFetch tier hit rates:")
+        for tier, attempts in self.attempts.items():
+            hits = self.hits.get(tier, 0)
+            print(f"  {tier}: {hits}/{attempts} ({hits / attempts:.1%})")
+
+def run_tiered(items, fetch_static, run_browser, stats, http_workers=HTTP_WORKERS):
+    """Try the plain-HTTP tier for every item and send only the misses to the browser.
+
+    fetch_static(item) returns a result dict or None on a miss. run_browser(items)
+    returns a list of results in the same order as the items it was given.
+    Blank items are skipped. Results are returned aligned with items.
+    """
+    results = [None] * len(items)
+    indexes = [index for index, item in enumerate(items) if item]
+
+    def try_static(index):
+        try:
+            result = fetch_static(items[index])
+        except Exception as e:
+            print(f"HTTP tier error for {items[index]}: {str(e)}")
+            result = None
+        stats.record('http', result is not None)
+        return index, result
+
+    with ThreadPoolExecutor(max_workers=http_workers) as executor:
+        for index, result in executor.map(try_static, indexes):
+            if result is not None:
+                result['tier'] = 'http'
+                results[index] = result
+
+    pending = [index for index in indexes if results[index] is None]
+    if pending:
+        print(f"\n{len(indexes) - len(pending)} of {len(indexes)} profiles read over plain HTTP, "
+              f"falling back to the browser for {len(pending)}")
+        browser_results = run_browser([items[index] for index in pending])
+        for index, result in zip(pending, browser_results):
+            if result is not None:
+                result['tier'] = 'browser'
+                stats.record('browser', result.get('follower_count') is not None)
+            results[index] = result
+
+    return results
@@ -1,6 +1,5 @@
 import sys
 import subprocess
-import datetime
 import pandas as pd
 
 def install_requirements():
@@ -26,61 +25,101 @@ if __name__ == '__main__':
 
 # Now import all required packages
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 import time
 import random
-import requests
-import json
-import re
+import argparse
 
-# Airtable configuration
-AIRTABLE_PAT = "patC3CJ296jcbbAMd.e12065cdff24c5b8e6ed1e9315fa4f5a9233ee9803efd602a7a2a74ff14c5057"
-AIRTABLE_BASE_ID = "appdeZcAttBaG5oVI"
-AIRTABLE_TABLE_NAME = "Politicians"
+from retry_scheduler import ScrapeError, check_page, MISSING, RATE_LIMITED
+from driver_factory import acquire_driver, apply_headless_profile
+from airtable_client import iter_airtable_pages, not_blank_formula, update_records, WRITE_BATCH_SIZE
+from http_fetch import meta_content
+from checkpoint import Checkpoint, JournaledWriter, checkpoint_path
+from handles import ScrapePlan
+from change_filter import ChangeFilter
+from resource_blocking import configure_options, apply_blocking, DEFAULT_PAGE_LOAD_STRATEGY
+from scrape_args import add_browser_arguments, browser_kwargs
+from scrape_run import scrape_counts, plan_page
+from count_parser import parse_count, FOLLOWERS_LABEL
+from strategy_stats import STRATEGY_STATS
+from page_extract import strategies_js, extract_in_page
+from page_ready import wait_until_ready, ready_js
+
+PLATFORM = 'instagram'
 
 def wait_random():
     time.sleep(random.uniform(1, 2))  # Slightly longer wait for Instagram
 
-def parse_follower_count(text):
+# Page text that means the handle will never resolve, or that Instagram is throttling us
+NOT_FOUND_MARKERS = ["Sorry, this page isn't available"]
+RATE_LIMIT_MARKERS = ['Please wait a few minutes before you try again']
+
+READY_JS = ready_js(selectors=['meta[property="og:description"]', "a[href*='/followers']"],
+                    markers=NOT_FOUND_MARKERS + RATE_LIMIT_MARKERS, url_parts=['/accounts/login'])
+FOLLOWERS_TEXT_READY_JS = ready_js(selectors=["a[href*='/followers']", 'span'], text='followers')
+READY_TIMEOUT = 10
+
+# In-page versions of the extraction methods, all run by one execute_script call
+EXTRACT_STRATEGIES = {
+    # Method 1: Try to find the meta tag first (most reliable)
+    'og:description': r"""(document.querySelector('meta[property="og:description"]') || {content: ''}).content.split(' ')[0] || null""",
+    # Method 2: Try the section containing stats
+    'followers-link': r"""textOf(xpathFirst("//a[contains(@href, '/followers')]/span/span")) || null""",
+    # Method 3: Try various CSS selectors
+    'stats-span': r"""firstWith("span[class*='_ac2a'], span[class*='_aacl'], span[class*='x1lliihq'], span[class*='x156sbe']", /\d/)""",
+    # Method 4: Try finding any span near the followers link
+    'followers-link-span': r"""textOf(xpathFirst("//a[contains(@href, '/followers')]//span[contains(@class, '_')]")) || null""",
+}
+EXTRACT_JS = strategies_js(EXTRACT_STRATEGIES)
+# The loose span matches often find the posts count, so they only run once the
+# methods anchored to the followers link or description found nothing
+STRATEGY_STATS.set_precision(PLATFORM, [['og:description', 'followers-link', 'followers-text'],
+                                        ['stats-span', 'followers-link-span']])
+
+# Last resort once the page has settled: any element whose own text is a followers count
+FOLLOWERS_TEXT_STRATEGIES = {
+    'followers-text': r"""(() => {
+        const elems = document.evaluate("//*[contains(text(),'followers') or contains(text(),'Followers')]", document,
+                                        null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < elems.snapshotLength; i++) {
+            const text = textOf(elems.snapshotItem(i));
+            if (/\d[\s\S]*followers?/i.test(text)) { return text; }
+        }
+        return null;
+    })()""",
+}
+FOLLOWERS_TEXT_JS = strategies_js(FOLLOWERS_TEXT_STRATEGIES)
+
+def get_follower_count(driver, username):
+    """Run the extraction methods in the page; returns (count, raw_text, method) or (None, None, None)."""
     try:
-        # Remove any non-numeric characters except commas, decimal points, and K/M/B
-        text = text.strip()
-        # Extract just the number part if it's in a format like "1.2M followers" or "2,771 followers"
-        number_match = re.search(r'([\d,\.]+\s*[KMBkmb]?)\s*(?:followers?)?', text, re.IGNORECASE)
-        if number_match:
-            number_str = number_match.group(1).strip()
-            
-            # Handle K, M, B suffixes
-            multiplier = 1
-            if number_str[-1].upper() == 'K':
-                multiplier = 1000
-                number_str = number_str[:-1]
-            elif number_str[-1].upper() == 'M':
-                multiplier = 1000000
-                number_str = number_str[:-1]
-            elif number_str[-1].upper() == 'B':
-                multiplier = 1000000000
-                number_str = number_str[:-1]
-            
-            # Remove commas and convert to float
-            number_str = number_str.replace(',', '')
-            return float(number_str) * multiplier
+        # Every method in one round trip, historically cheapest first
+        result = extract_in_page(driver, PLATFORM, EXTRACT_JS, EXTRACT_STRATEGIES, parse_count)
+        if result[0] is not None:
+            return result
+        
+        # If we get here, wait for any followers text to render and try one last time
+        wait_until_ready(driver, PLATFORM, FOLLOWERS_TEXT_READY_JS, 5, replaced_sleep=5)
+        result = extract_in_page(driver, PLATFORM, FOLLOWERS_TEXT_JS, FOLLOWERS_TEXT_STRATEGIES,
+                                 lambda text: parse_count(text, FOLLOWERS_LABEL))
+        if result[0] is not None:
+            return result
+        
+        raise ValueError("Could not find follower count")
+        
     except Exception as e:
-        print(f"Error parsing follower count '{text}': {str(e)}")
-    return None
+        print(f"Error getting follower count: {str(e)}")
+        return None, None, None
 
-def get_follower_counts(usernames, max_retries=2):
+def build_chrome_options(page_load_strategy=DEFAULT_PAGE_LOAD_STRATEGY, headless=False, network_stats=False):
     # Setup Chrome options
     options = webdriver.ChromeOptions()
     options.add_argument('--disable-gpu')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
+    if headless:
+        apply_headless_profile(options)
+    else:
+        options.add_argument('--window-size=1920,1080')
     options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
     # Add these options to suppress WebGL warnings
     options.add_argument('--disable-software-rasterizer')
@@ -89,242 +128,158 @@ def get_follower_counts(usernames, max_retries=2):
     # Suppress logging
     options.add_experimental_option('excludeSwitches', ['enable-logging'])
     
-    results = []
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    driver = None
-    total_users = len(usernames)
-    
-    try:
-        print("Initializing Chrome driver...")
-        try:
-            service = Service()
-            driver = webdriver.Chrome(service=service, options=options)
-        except Exception as e:
-            print(f"Error with default service, trying ChromeDriverManager: {str(e)}")
-            try:
-                service = Service(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=service, options=options)
-            except Exception as e:
-                print(f"Error with ChromeDriverManager: {str(e)}")
-                service = Service("chromedriver.exe")
-                driver = webdriver.Chrome(service=service, options=options)
+    return configure_options(options, page_load_strategy, network_stats)
 
-        for index, username in enumerate(usernames, 1):  
-            if not username:
-                continue
-                
-            retries = 0
-            follower_count = None
-            error_message = None
-            
-            while retries < max_retries and follower_count is None:
-                try:
-                    print(f"\n{index}/{total_users} @{username} (Attempt {retries + 1}/{max_retries})")
-                    url = f"https://www.instagram.com/{username}/"
-                    driver.get(url)
-                    
-                    def get_follower_count(driver, username):
-                        try:
-                            # Wait for initial page load
-                            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-                            
-                            # Try to find the follower count using multiple methods
-                            methods = [
-                                # Method 1: Try to find the meta tag first (most reliable)
-                                lambda: driver.find_element(By.CSS_SELECTOR, 'meta[property="og:description"]').get_attribute("content").split(" ")[0],
-                                
-                                # Method 2: Try the section containing stats
-                                lambda: driver.find_element(By.XPATH, "//a[contains(@href, '/followers')]/span/span").text,
-                                
-                                # Method 3: Try various CSS selectors
-                                lambda: next(
-                                    element.text for element in driver.find_elements(By.CSS_SELECTOR, 
-                                    "span[class*='_ac2a'], span[class*='_aacl'], span[class*='x1lliihq'], span[class*='x156sbe']")
-                                    if element.text and any(c.isdigit() for c in element.text)
-                                ),
-                                
-                                # Method 4: Try finding any span near the followers link
-                                lambda: driver.find_element(By.XPATH, "//a[contains(@href, '/followers')]//span[contains(@class, '_')]").text
-                            ]
-                            
-                            # Try each method
-                            for method in methods:
-                                try:
-                                    count_text = method()
-                                    if count_text:
-                                        # Clean up the text and extract numbers
-                                        count = ''.join(filter(str.isdigit, count_text))
-                                        if count:
-                                            return int(count)
-                                except Exception:
-                                    continue
-                            
-                            # If we get here, try one last time with a longer wait
-                            time.sleep(5)  # Wait a bit longer
-                            elements = driver.find_elements(By.XPATH, "//*[contains(text(),'followers') or contains(text(),'Followers')]")
-                            for elem in elements:
-                                text = elem.text
-                                if text and any(c.isdigit() for c in text):
-                                    count = ''.join(filter(str.isdigit, text))
-                                    if count:
-                                        return int(count)
-                            
-                            raise ValueError("Could not find follower count")
-                            
-                        except Exception as e:
-                            print(f"Error getting follower count: {str(e)}")
-                            return None
-                    
-                    follower_count = get_follower_count(driver, username)
-                    
-                    if follower_count is not None:
-                        print(f"Successfully found follower count: {follower_count}")
-                        break
-                        
-                    # If we haven't found the count yet, wait and try again
-                    time.sleep(2)
-                    
-                    # Add a longer wait for Instagram to load dynamic content
-                    time.sleep(3)
-                    wait_random()
-                    
-                except TimeoutException as e:
-                    error_message = f"Timeout: {str(e)}"
-                    print(f"Timeout while processing {username}")
-                    retries += 1
-                    if retries < max_retries:
-                        print(f"Retrying... ({retries}/{max_retries})")
-                        wait_random()
-                except Exception as e:
-                    error_message = str(e)
-                    print(f"Error processing {username}: {str(e)}")
-                    retries += 1
-                    if retries < max_retries:
-                        print(f"Retrying... ({retries}/{max_retries})")
-                        wait_random()
-            
-            # Add result whether successful or not
-            results.append({
-                'username': username,
-                'follower_count': follower_count,
-                'timestamp': timestamp,
-                'error': error_message if follower_count is None else None
-            })
-            
-            if follower_count is not None:
-                print(f"Successfully retrieved follower count for {username}: {follower_count:,.0f}")
-            else:
-                print(f"Failed to process {username} after {max_retries} attempts: {error_message}")
-            
-            wait_random()
-            
-    except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-    finally:
-        if driver:
-            driver.quit()
-            
-    return results
+def create_driver(page_load_strategy=DEFAULT_PAGE_LOAD_STRATEGY, block_resources=True, headless=False,
+                  network_stats=False):
+    """Get a warm Chrome session from the shared driver factory."""
+    driver = acquire_driver(build_chrome_options(page_load_strategy, headless, network_stats),
+                            disposable_profile=headless)
+    apply_blocking(driver, PLATFORM, block_resources)
+    return driver
 
-def get_airtable_records():
-    """Fetch records from Airtable."""
-    headers = {
-        'Authorization': f'Bearer {AIRTABLE_PAT}',
-        'Content-Type': 'application/json',
-    }
+def scrape_profile(driver, index, username, total_users, timestamp):
+    """Make one attempt at the follower count; raises ScrapeError when it cannot be read."""
+    if not username:
+        return None
+    
+    print(f"\n{index}/{total_users} @{username}")
+    url = f"https://www.instagram.com/{username}/"
+    start = time.perf_counter()
+    driver.get(url)
+    # Wait until the stats (or a login wall / missing page) are rendered
+    wait_until_ready(driver, PLATFORM, READY_JS, READY_TIMEOUT)
+    fetch_time = time.perf_counter() - start
+    
+    follower_count, raw_text, method = get_follower_count(driver, username)
     
-    url = f'https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}'
-    response = requests.get(url, headers=headers)
+    if follower_count is None:
+        # A login wall is temporary, so it is retried like a rate limit
+        if '/accounts/login' in driver.current_url:
+            raise ScrapeError(RATE_LIMITED, "Redirected to login")
+        check_page(driver, NOT_FOUND_MARKERS, RATE_LIMIT_MARKERS)
+        raise ScrapeError(MISSING, "Could not find follower count")
     
-    if response.status_code == 200:
-        records = response.json().get('records', [])
-        return [{
+    print(f"Successfully retrieved follower count for {username}: {follower_count:,.0f}")
+    wait_random()
+    
+    return {
+        'username': username,
+        'follower_count': follower_count,
+        'timestamp': timestamp,
+        'error': None,
+        'raw_text': raw_text,
+        'method': method,
+        'fetch_time': round(fetch_time, 3)
+    }
+
+def extract_from_html(soup):
+    """Read the follower count from the og:description meta tag of a server-rendered profile.
+
+    Returns (count, raw_text, method) or (None, None, None).
+    """
+    content = meta_content(soup, 'og:description', 'description')
+    if content and 'follower' in content.lower():
+        count = parse_count(content)
+        if count is not None:
+            return count, content, 'og:description'
+    return None, None, None
+
+def extract_count_from_html(soup):
+    """Just the count from extract_from_html."""
+    return extract_from_html(soup)[0]
+
+def get_follower_counts(usernames, max_retries=2, **kwargs):
+    """Scrape follower counts for usernames, over plain HTTP first; see scrape_run.scrape_counts."""
+    return scrape_counts(PLATFORM, usernames, scrape_profile, build_chrome_options, create_driver,
+                         extract_from_html, max_retries=max_retries, **kwargs)
+
+def iter_airtable_records():
+    """Yield pages of records, with the count Airtable holds now, as they arrive."""
+    for page in iter_airtable_pages(fields=['ig_user', 'ig_followers'], formula=not_blank_formula('ig_user')):
+        yield [{
             'id': record['id'],
             'ig_user': record.get('fields', {}).get('ig_user', ''),
-        } for record in records if record.get('fields', {}).get('ig_user')]
-    else:
-        print(f"Error fetching Airtable records: {response.status_code}")
-        return []
+            'ig_followers': record.get('fields', {}).get('ig_followers'),
+        } for record in page if record.get('fields', {}).get('ig_user')]
 
 def update_airtable_batch(updates):
-    """Update multiple records in Airtable in a single request."""
+    """Update multiple records in Airtable; returns one success flag per update."""
     if not updates:
         return True
-        
-    headers = {
-        'Authorization': f'Bearer {AIRTABLE_PAT}',
-        'Content-Type': 'application/json',
-    }
-    
-    url = f'https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}'
-    
-    # Process updates in batches of 10
-    batch_size = 10
-    success = True
-    
-    for i in range(0, len(updates), batch_size):
-        batch = updates[i:i + batch_size]
-        
-        # Prepare the records for batch update
-        payload = {
-            'records': [{
-                'id': update['id'],
-                'fields': {
-                    'ig_followers': update['follower_count']
-                }
-            } for update in batch]
+    return update_records([{
+        'id': update['id'],
+        'fields': {
+            'ig_followers': update['follower_count']
         }
-        
-        response = requests.patch(url, headers=headers, json=payload)
-        
-        if response.status_code == 200:
-            print(f"Successfully updated batch of {len(batch)} records in Airtable")
-        else:
-            print(f"Error updating Airtable records: {response.status_code}")
-            print(response.text)
-            success = False
-            
-    return success
+    } for update in updates])
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Instagram follower counts into Airtable")
+    add_browser_arguments(parser)
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the last run from its checkpoint and replay unwritten updates")
+    parser.add_argument('--checkpoint', default=checkpoint_path(PLATFORM), help="Checkpoint journal file")
+    args = parser.parse_args()
+    
     print("Fetching Instagram usernames from Airtable...")
-    airtable_records = get_airtable_records()
+    airtable_records = []
+    plan = ScrapePlan(PLATFORM)
+    changes = ChangeFilter(args.min_delta)
+    results = []
+    
+    # Results are journaled and written to Airtable, several batches of 10 at a time, while scraping continues
+    checkpoint = Checkpoint(args.checkpoint, resume=args.resume)
+    writer = JournaledWriter(update_airtable_batch, checkpoint, key=lambda update: update['id'],
+                             batch_size=WRITE_BATCH_SIZE).start()
+    
+    def queue_update(data, record_ids=None):
+        if data['follower_count'] is None:
+            return
+        # Every record that lists this handle gets the count
+        for record_id in record_ids or plan.record_ids(data['username']):
+            if not changes.should_write(record_id, 'ig_followers', data['follower_count']):
+                continue
+            writer.put({
+                'id': record_id,
+                'follower_count': data['follower_count'],
+                'timestamp': data['timestamp']
+            })
+    
+    def on_result(data):
+        plan.record_result(data)
+        queue_update(data)
+        checkpoint.record_result(PLATFORM, data)
+    
+    # Start scraping each page of records as soon as it arrives
+    try:
+        for page in iter_airtable_records():
+            airtable_records.extend(page)
+            print(f"Fetched {len(page)} Instagram usernames ({len(airtable_records)} so far)")
+            rows = [(record['id'], record['ig_user'], record['ig_followers']) for record in page]
+            usernames, done = plan_page(PLATFORM, rows, plan, changes, checkpoint, queue_update)
+            results.extend(done)
+            results.extend(get_follower_counts(usernames, on_result=on_result,
+                                               **browser_kwargs(args, PLATFORM)))
+    except Exception as e:
+        print(f"Error fetching Airtable records: {str(e)}")
+    
+    # Flush the last partial batch
+    success_count = writer.close()
+    checkpoint.close()
     
     if not airtable_records:
         print("No Instagram usernames found in Airtable")
         sys.exit(1)
         
     print(f"Found {len(airtable_records)} Instagram usernames")
-    
-    # Get follower counts
-    usernames = [record['ig_user'] for record in airtable_records]
-    results = get_follower_counts(usernames)
+    plan.report()
+    changes.report()
     
     if not results:
         print("No follower data retrieved")
         sys.exit(1)
         
-    # Prepare updates for Airtable
-    updates = []
-    success_count = 0
-    
-    for data in results:
-        for record in airtable_records:
-            if record['ig_user'] == data['username']:
-                if data['follower_count'] is not None:
-                    updates.append({
-                        'id': record['id'],
-                        'follower_count': data['follower_count'],
-                        'timestamp': data['timestamp']
-                    })
-                break
-    
-    # Update Airtable in batches
-    if updates:
-        print(f"Updating {len(updates)} records in Airtable...")
-        if update_airtable_batch(updates):
-            success_count = len(updates)
-    
     # Separate successful and failed results
     successful_results = []
     failed_results = []
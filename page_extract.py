@@ -0,0 +1,60 @@
+import json
+
+from strategy_stats import STRATEGY_STATS
+
+# Runs named extraction strategies in the order given as arguments[0] and
+# stops at the first one that finds text. Every strategy tried reports its
+# in-page run time, so one execute_script call replaces a find_element and
+# a .text round trip per selector.
+RUN_STRATEGIES_JS = """
+    const textOf = elem => elem ? (elem.innerText || elem.textContent || '').trim() : '';
+    const xpathFirst = xpath => document.evaluate(xpath, document, null,
+                                                  XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    const firstWith = (selector, pattern) => {
+        for (const elem of document.querySelectorAll(selector)) {
+            const text = textOf(elem);
+            if (text && pattern.test(text)) { return text; }
+        }
+        return null;
+    };
+    const strategies = {%s};
+    const tried = [];
+    for (const name of arguments[0]) {
+        const start = performance.now();
+        let text = null;
+        try { text = strategies[name] ? strategies[name]() : null; } catch (e) { text = null; }
+        tried.push({strategy: name, ms: performance.now() - start, text: text || null});
+        if (text) { break; }
+    }
+    return JSON.stringify(tried);
+"""
+
+
+def strategies_js(strategies):
+    """Build the extraction script from {name: JS expression returning text or null}.
+
+    The expressions can use textOf(elem), xpathFirst(xpath) and
+    firstWith(selector, regex).
+    """
+    functions = ', '.join(f'{json.dumps(name)}: () => ({expression})' for name, expression in strategies.items())
+    return RUN_STRATEGIES_JS % functions
+
+def extract_in_page(driver, platform, script, names, parse):
+    """Run script over names, ranked by STRATEGY_STATS, and parse the first hit.
+
+    parse(text) turns a snippet into a count. If a strategy finds text that
+    does not parse, the remaining strategies are run in another call.
+    Returns (count, raw_text, strategy) or (None, None, None).
+    """
+    remaining = STRATEGY_STATS.order(platform, list(names))
+    while remaining:
+        tried = json.loads(driver.execute_script(script, remaining) or '[]')
+        if not tried:
+            break
+        for entry in tried:
+            count = parse(entry['text']) if entry['text'] else None
+            STRATEGY_STATS.record(platform, entry['strategy'], count is not None, entry['ms'] / 1000)
+            if count is not None:
+                return count, entry['text'], entry['strategy']
+        remaining = remaining[len(tried):]
+    return None, None, None
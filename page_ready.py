@@ -0,0 +1,116 @@
+import json
+import math
+import time
+import threading
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# Resolves as soon as the page-specific predicate holds. Checks run on DOM
+# mutations (throttled to one per 50ms) instead of on a fixed polling loop.
+WAIT_FOR_PREDICATE_JS = """
+    const predicate = new Function(arguments[0]);
+    const timeoutMs = arguments[1];
+    const done = arguments[arguments.length - 1];
+    const check = () => { try { return !!predicate(); } catch (e) { return false; } };
+    if (check()) { done(true); return; }
+
+    let scheduled = false;
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        if (scheduled) { return; }
+        scheduled = true;
+        setTimeout(() => {
+            scheduled = false;
+            if (check()) {
+                observer.disconnect();
+                clearTimeout(timer);
+                done(true);
+            }
+        }, 50);
+    });
+    observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    timer = setTimeout(() => { observer.disconnect(); done(check()); }, timeoutMs);
+"""
+
+
+class ReadinessStats:
+    """Time spent waiting for pages compared with the fixed sleeps the waits replaced."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = {}
+        self.timeouts = {}
+        self.waited = {}
+        self.replaced = {}
+
+    def record(self, platform, waited, replaced, ready):
+        with self._lock:
+            self.pages[platform] = self.pages.get(platform, 0) + 1
+            self.timeouts[platform] = self.timeouts.get(platform, 0) + (0 if ready else 1)
+            self.waited[platform] = self.waited.get(platform, 0.0) + waited
+            self.replaced[platform] = self.replaced.get(platform, 0.0) + replaced
+
+    def report(self, platform):
+        with self._lock:
+            pages = self.pages.get(platform, 0)
+            if not pages:
+                return
+            waited = self.waited[platform]
+            replaced = self.replaced[platform]
+            timeouts = self.timeouts[platform]
+        print(f"\nPage readiness ({platform}): {pages} waits, {timeouts} timed out, "
+              f"{waited:.1f}s spent waiting vs {replaced:.1f}s of fixed sleeps "
+              f"({replaced - waited:+.1f}s removed, {(replaced - waited) / pages:+.2f}s per page)")
+
+READINESS_STATS = ReadinessStats()
+
+def wait_until_ready(driver, platform, predicate_js, timeout=10, replaced_sleep=0.0, replaced_poll=None,
+                     replaced_polls=None, replaced_fallback_wait=0.0, replaced_fallback_sleep=0.0):
+    """Wait until predicate_js (a function body returning a boolean) holds in the page.
+
+    Returns True when the predicate held before the timeout. The replaced_*
+    arguments describe what this wait stands in for and only feed
+    READINESS_STATS: replaced_sleep is a fixed sleep, replaced_poll the
+    interval of a polling loop (which rounds the wait up to its next poll).
+    A loop limited to replaced_polls attempts that gave up then waited up to
+    replaced_fallback_wait for the page and slept replaced_fallback_sleep.
+    """
+    start = time.perf_counter()
+    try:
+        driver.set_script_timeout(timeout + 5)
+        ready = bool(driver.execute_async_script(WAIT_FOR_PREDICATE_JS, predicate_js, int(timeout * 1000)))
+    except (TimeoutException, WebDriverException) as e:
+        print(f"Readiness check failed: {str(e).strip()[:200]}")
+        ready = False
+    waited = time.perf_counter() - start
+
+    replaced = replaced_sleep
+    if replaced_poll and (not replaced_polls or waited <= replaced_poll * (replaced_polls - 1)):
+        replaced += math.ceil(waited / replaced_poll) * replaced_poll
+    elif replaced_poll:
+        # The last poll came too early: the loop slept out its final interval and fell back
+        window = replaced_poll * replaced_polls
+        replaced += window + min(max(waited - window, 0.0), replaced_fallback_wait) + replaced_fallback_sleep
+    READINESS_STATS.record(platform, waited, replaced, ready)
+    return ready
+
+def ready_js(selectors=(), text=None, markers=(), url_parts=()):
+    """Build a readiness predicate for wait_until_ready.
+
+    The page counts as ready when an element matches one of selectors (and,
+    with text, contains it), when the title or a heading shows one of
+    markers, or when the URL contains one of url_parts, so login walls and
+    missing pages resolve the wait instead of running into the timeout.
+    """
+    return """
+    const selectors = %s, text = %s, markers = %s, urlParts = %s;
+    if (urlParts.some(part => location.href.includes(part))) { return true; }
+    for (const selector of selectors) {
+        for (const elem of document.querySelectorAll(selector)) {
+            if (text === null || elem.textContent.toLowerCase().includes(text)) { return true; }
+        }
+    }
+    const headings = Array.from(document.querySelectorAll('title, h1, h2'), elem => elem.textContent).join(' ');
+    return markers.some(marker => headings.includes(marker));
+    """ % (json.dumps(list(selectors)), json.dumps(text.lower() if text else None),
+           json.dumps(list(markers)), json.dumps(list(url_parts)))
@@ -0,0 +1,80 @@
+import importlib
+
+from count_parser import SUBSCRIBERS_LABEL
+
+# Every platform the scrapers cover, with the Airtable columns it reads and writes.
+# static_html marks platforms whose counts can be read without a browser and
+# count_label is the label a count must precede when it is parsed. domains,
+# path_prefixes and handle_pattern let handles.canonical_handle turn whatever
+# was typed into Airtable (URLs, @handles) into the handle the url expects.
+# reserved_paths are first path segments that name a post, video or site page
+# rather than a profile, id_paths are segments followed by a numeric profile id
+# and link_domains are short-link domains that never point at a profile.
+PLATFORMS = {
+    'twitter': {
+        'module': 'twitter_follower_scraper',
+        'url': 'https://twitter.com/{username}',
+        'username_field': 'twitter_user',
+        'followers_field': 'twitter_followers',
+        'count_label': None,
+        'static_html': False,
+        'domains': ['twitter.com', 'x.com'],
+        'path_prefixes': [],
+        'handle_pattern': r'[a-z0-9_]{1,15}',
+        'reserved_paths': ['i', 'intent', 'share', 'home', 'search', 'hashtag', 'explore', 'settings',
+                           'messages', 'notifications', 'compose', 'login', 'signup', 'tos', 'privacy'],
+        'id_paths': [],
+        'link_domains': [],
+    },
+    'instagram': {
+        'module': 'instagram_follower_scraper',
+        'url': 'https://www.instagram.com/{username}/',
+        'username_field': 'ig_user',
+        'followers_field': 'ig_followers',
+        'count_label': None,
+        'static_html': True,
+        'domains': ['instagram.com', 'instagr.am'],
+        'path_prefixes': [],
+        'handle_pattern': r'[a-z0-9._]{1,30}',
+        'reserved_paths': ['p', 'reel', 'reels', 'tv', 'stories', 'explore', 'accounts', 'direct', 'about'],
+        'id_paths': [],
+        'link_domains': [],
+    },
+    'youtube': {
+        'module': 'youtube_follower_scraper',
+        'url': 'https://www.youtube.com/@{username}',
+        'username_field': 'youtube_user',
+        'followers_field': 'youtube_followers',
+        'count_label': SUBSCRIBERS_LABEL,
+        'static_html': True,
+        'domains': ['youtube.com', 'youtu.be'],
+        'path_prefixes': ['c', 'user'],
+        'handle_pattern': r'[a-z0-9._-]{3,30}',
+        # Channel ids (/channel/UC...) are case-sensitive and not @handles, so they are rejected
+        'reserved_paths': ['channel', 'watch', 'shorts', 'playlist', 'results', 'feed', 'embed', 'live',
+                           'redirect', 'hashtag', 'premium', 'account'],
+        'id_paths': [],
+        'link_domains': ['youtu.be'],
+    },
+    'facebook': {
+        'module': 'facebook_follower_scraper',
+        'url': 'https://www.facebook.com/{username}',
+        'username_field': 'facebook_user',
+        'followers_field': 'facebook_followers',
+        'count_label': None,
+        'static_html': True,
+        'domains': ['facebook.com', 'fb.com'],
+        'path_prefixes': ['pg'],
+        'handle_pattern': r'[a-z0-9.-]{1,50}|profile\.php\?id=\d+',
+        'reserved_paths': ['pages', 'people', 'groups', 'events', 'watch', 'photo', 'photo.php', 'story.php',
+                           'permalink.php', 'profile.php', 'sharer', 'sharer.php', 'share', 'login', 'home.php',
+                           'marketplace', 'gaming', 'hashtag', 'help', 'reel'],
+        'id_paths': ['pages', 'people'],
+        'link_domains': [],
+    },
+}
+
+
+def load_scraper(platform):
+    """Import and return the scraper module for a platform."""
+    return importlib.import_module(PLATFORMS[platform]['module'])
@@ -0,0 +1,39 @@
+import threading
+
+
+class RecordIndex:
+    """Hash index from a handle's key to the ids of every record listing it.
+
+    Filled as Airtable pages arrive, so a scrape result is matched to all of
+    its records with one lookup instead of a scan over the table. key(handle)
+    gives the form handles are matched on, e.g. handles.canonical_handle;
+    handles it maps to None or '' are not indexed.
+    """
+
+    def __init__(self, key, pairs=()):
+        self.key = key
+        self._ids = {}  # key -> [record ids]
+        self._lock = threading.Lock()
+        self.add_all(pairs)
+
+    def add(self, record_id, handle):
+        key = self.key(handle)
+        if not key:
+            return
+        with self._lock:
+            ids = self._ids.setdefault(key, [])
+            if record_id not in ids:
+                ids.append(record_id)
+
+    def add_all(self, pairs):
+        """Index (record_id, handle) pairs."""
+        for record_id, handle in pairs:
+            self.add(record_id, handle)
+
+    def record_ids(self, handle):
+        """Ids of every record with this handle, in the order they were added."""
+        with self._lock:
+            return list(self._ids.get(self.key(handle), ()))
+
+    def __len__(self):
+        return len(self._ids)
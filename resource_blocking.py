@@ -0,0 +1,107 @@
+import json
+import threading
+
+# Requests the scrapers never need: every count we read is text in the DOM.
+# Patterns use Chrome's Network.setBlockedURLs wildcard syntax.
+COMMON_BLOCKED_URLS = [
+    # Images and icons
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.ico', '*.bmp',
+    # Video and audio
+    '*.mp4', '*.webm', '*.m4s', '*.m3u8', '*.mp3',
+    # Fonts
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    # Ads and analytics
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*googleadservices.com*', '*connect.facebook.net*',
+]
+
+# Media hosts per platform. Only image/video CDNs are listed: the script and
+# stylesheet hosts (abs.twimg.com, static.cdninstagram.com, static.xx.fbcdn.net)
+# are needed to render the profile.
+BLOCKED_URLS = {
+    'twitter': COMMON_BLOCKED_URLS + ['*pbs.twimg.com*', '*video.twimg.com*', '*ads-twitter.com*'],
+    'instagram': COMMON_BLOCKED_URLS + ['*scontent*.cdninstagram.com*', '*scontent*.fbcdn.net*'],
+    'youtube': COMMON_BLOCKED_URLS + ['*i.ytimg.com*', '*yt3.ggpht.com*', '*googlevideo.com*',
+                                      '*youtube.com/api/stats*', '*youtube.com/ptracking*'],
+    'facebook': COMMON_BLOCKED_URLS + ['*scontent*.fbcdn.net*', '*video*.fbcdn.net*'],
+}
+
+PAGE_LOAD_STRATEGIES = ['eager', 'normal']
+DEFAULT_PAGE_LOAD_STRATEGY = 'eager'
+
+
+def configure_options(options, page_load_strategy=DEFAULT_PAGE_LOAD_STRATEGY, network_stats=False):
+    """Set the page load strategy, and with network_stats turn on the network log TransferStats reads.
+
+    With 'eager', driver.get() returns at DOMContentLoaded instead of waiting
+    for every subresource; the readiness waits cover the rest. The network
+    log costs an extra round trip per page that can carry megabytes of
+    events, so it is only for measuring (--network-stats, benchmarks).
+    """
+    options.page_load_strategy = page_load_strategy
+    if network_stats:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+def apply_blocking(driver, platform, enabled=True):
+    """Block the platform's unneeded resources in this session, or clear the list.
+
+    Pooled sessions may have been used for another platform, so this is
+    called on every acquire.
+    """
+    urls = BLOCKED_URLS.get(platform, COMMON_BLOCKED_URLS) if enabled else []
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': urls})
+    except Exception as e:
+        print(f"Could not set blocked URLs: {str(e)}")
+    return driver
+
+class TransferStats:
+    """Bytes transferred and requests blocked per page, read from Chrome's performance log."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = {}
+        self.bytes = {}
+        self.requests = {}
+        self.blocked = {}
+
+    def collect(self, driver, key):
+        """Drain the session's network log and count it as one page load under key."""
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return
+        transferred = requests = blocked = 0
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if message.get('method') == 'Network.loadingFinished':
+                transferred += message['params'].get('encodedDataLength', 0)
+                requests += 1
+            elif message.get('method') == 'Network.loadingFailed' and message['params'].get('blockedReason'):
+                blocked += 1
+        with self._lock:
+            self.pages[key] = self.pages.get(key, 0) + 1
+            self.bytes[key] = self.bytes.get(key, 0) + transferred
+            self.requests[key] = self.requests.get(key, 0) + requests
+            self.blocked[key] = self.blocked.get(key, 0) + blocked
+
+    def bytes_per_page(self, key):
+        with self._lock:
+            pages = self.pages.get(key, 0)
+            return self.bytes[key] / pages if pages else None
+
+    def report(self, key):
+        with self._lock:
+            pages = self.pages.get(key, 0)
+            if not pages:
+                return
+            transferred, requests, blocked = self.bytes[key], self.requests[key], self.blocked[key]
+        print(f"\nNetwork ({key}): {pages} pages, {transferred / pages / 1024:.0f} KB and "
+              f"{requests / pages:.0f} requests per page, {blocked / pages:.0f} requests blocked per page")
+
+TRANSFER_STATS = TransferStats()
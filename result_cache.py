@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import datetime
+import threading
+
+from count_parser import parse_count
+from platforms import PLATFORMS
+
+# Local cache of recent scrape results, keyed by (platform, username)
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'socialscraper', 'results.sqlite3')
+DEFAULT_TTL_HOURS = 12
+# Raw snippets are kept for offline re-parsing; counts always come first in
+# them, so the tail of long meta descriptions is not worth storing
+RAW_TEXT_LIMIT = 200
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ResultCache:
+    """On-disk cache of successful follower counts with a freshness TTL."""
+
+    def __init__(self, path=CACHE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                platform TEXT NOT NULL,
+                username TEXT NOT NULL,
+                follower_count INTEGER NOT NULL,
+                scraped_at INTEGER NOT NULL,
+                method TEXT,
+                raw_text TEXT,
+                fetch_ms INTEGER,
+                tier TEXT,
+                PRIMARY KEY (platform, username)
+            )
+        """)
+        # Caches created before raw_text/fetch_ms/tier were recorded
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}
+        for column, kind in [('raw_text', 'TEXT'), ('fetch_ms', 'INTEGER'), ('tier', 'TEXT')]:
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE results ADD COLUMN {column} {kind}")
+        self._conn.commit()
+
+    def store(self, platform, result):
+        """Remember a successful result; failed results are never cached."""
+        if result.get('follower_count') is None:
+            return
+        raw_text = result.get('raw_text')
+        fetch_time = result.get('fetch_time')
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(platform, username, follower_count, scraped_at, method, raw_text, fetch_ms, tier) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (platform, result['username'].lower(), int(result['follower_count']), int(time.time()),
+                 result.get('method'), raw_text[:RAW_TEXT_LIMIT] if raw_text else None,
+                 int(fetch_time * 1000) if fetch_time is not None else None,
+                 result.get('tier') or 'browser'))
+            self._conn.commit()
+
+    def fresh_results(self, platform, usernames, ttl_hours):
+        """Return {username: result} for usernames scraped within the last ttl_hours."""
+        cutoff = int(time.time() - ttl_hours * 3600)
+        wanted = {username.lower(): username for username in usernames if username}
+        fresh = {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT username, follower_count, scraped_at, method, raw_text FROM results "
+                "WHERE platform = ? AND scraped_at >= ?", (platform, cutoff)).fetchall()
+        for username, follower_count, scraped_at, method, raw_text in rows:
+            if username in wanted:
+                fresh[wanted[username]] = {
+                    'username': wanted[username],
+                    'follower_count': follower_count,
+                    'timestamp': datetime.datetime.fromtimestamp(scraped_at).strftime('%Y-%m-%d %H:%M:%S'),
+                    'error': None,
+                    'tier': 'cache',
+                    'method': method,
+                    'raw_text': raw_text,
+                    'fetch_time': None,
+                }
+        return fresh
+
+    def entries(self, platform=None):
+        query = "SELECT platform, username, follower_count, scraped_at, method, raw_text, fetch_ms, tier FROM results"
+        params = ()
+        if platform:
+            query += " WHERE platform = ?"
+            params = (platform,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY platform, username", params).fetchall()
+
+    def update_count(self, platform, username, follower_count):
+        """Overwrite a stored count without touching its scrape time."""
+        with self._lock:
+            self._conn.execute("UPDATE results SET follower_count = ? WHERE platform = ? AND username = ?",
+                               (follower_count, platform, username))
+            self._conn.commit()
+
+    def evict(self, platform=None, username=None, older_than_hours=None):
+        """Delete matching entries and return how many were removed."""
+        conditions, params = [], []
+        if platform:
+            conditions.append("platform = ?")
+            params.append(platform)
+        if username:
+            conditions.append("username = ?")
+            params.append(username.lower())
+        if older_than_hours is not None:
+            conditions.append("scraped_at < ?")
+            params.append(int(time.time() - older_than_hours * 3600))
+        query = "DELETE FROM results"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            removed = self._conn.execute(query, params).rowcount
+            self._conn.commit()
+        return removed
+
+def get_cache():
+    """The cache shared by every scrape in the process, opened on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
+
+def split_cached(platform, usernames, cache_ttl):
+    """Split usernames into fresh cached results and usernames that still need scraping.
+
+    Returns (cache, cached, pending) where cached maps username to a result
+    marked tier='cache'. With no cache_ttl the cache is bypassed and None is
+    returned in its place.
+    """
+    if not cache_ttl:
+        return None, {}, list(usernames)
+
+    cache = get_cache()
+    cached = cache.fresh_results(platform, usernames, cache_ttl)
+    if cached:
+        print(f"Skipping {len(cached)} {platform} profiles scraped in the last {cache_ttl:g}h")
+    pending = [username for username in usernames if username not in cached]
+    return cache, cached, pending
+
+def merge_cached(usernames, cached, results):
+    """Interleave cached results back into scraped results, in usernames order."""
+    scraped = iter(results)
+    return [cached[username] if username in cached else next(scraped) for username in usernames]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or evict cached follower counts")
+    parser.add_argument('--path', default=CACHE_PATH, help="Cache database file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help="Show cached entries")
+    list_parser.add_argument('--platform')
+    list_parser.add_argument('--ttl', type=float, default=DEFAULT_TTL_HOURS,
+                             help="Hours an entry counts as fresh")
+
+    reparse_parser = commands.add_parser('reparse', help="Parse stored raw snippets again, without any network")
+    reparse_parser.add_argument('--platform')
+    reparse_parser.add_argument('--update', action='store_true', help="Store the re-parsed counts")
+
+    evict_parser = commands.add_parser('evict', help="Delete cached entries")
+    evict_parser.add_argument('--platform')
+    evict_parser.add_argument('--username')
+    evict_parser.add_argument('--older-than', type=float, help="Only entries older than this many hours")
+    evict_parser.add_argument('--all', action='store_true', help="Required to evict without any filter")
+
+    args = parser.parse_args()
+    cache = ResultCache(args.path)
+
+    if args.command == 'list':
+        now = time.time()
+        entries = cache.entries(args.platform)
+        for platform, username, follower_count, scraped_at, method, raw_text, fetch_ms, tier in entries:
+            age_hours = (now - scraped_at) / 3600
+            state = 'fresh' if age_hours <= args.ttl else 'stale'
+            fetch = f"{fetch_ms}ms" if fetch_ms is not None else '-'
+            print(f"{platform:<10} {username:<30} {follower_count:>14,} {age_hours:>7.1f}h {state:<6} "
+                  f"{tier or '-':<8} {method or '-':<20} {fetch:>8}  {(raw_text or '')[:40]!r}")
+        print(f"\n{len(entries)} cached entries in {args.path}")
+    elif args.command == 'reparse':
+        changed = checked = 0
+        for platform, username, follower_count, _, method, raw_text, _, _ in cache.entries(args.platform):
+            if not raw_text:
+                continue
+            checked += 1
+            count = parse_count(raw_text, PLATFORMS.get(platform, {}).get('count_label'))
+            if count != follower_count:
+                changed += 1
+                print(f"{platform:<10} {username:<30} {follower_count:>14,} -> {count if count is not None else 'None':>14} "
+                      f"{method or '-':<20} {raw_text[:60]!r}")
+                if args.update and count is not None:
+                    cache.update_count(platform, username, count)
+        print(f"\n{changed} of {checked} stored snippets parse differently"
+              + (" (updated)" if args.update and changed else ""))
+    else:
+        if not (args.platform or args.username or args.older_than is not None or args.all):
+            print("Refusing to evict everything without --all")
+            sys.exit(1)
+        removed = cache.evict(args.platform, args.username, args.older_than)
+        print(f"Evicted {removed} cached entries")
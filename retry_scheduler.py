@@ -0,0 +1,100 @@
+import time
+import heapq
+import random
+import threading
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# Failure kinds
+TIMEOUT = 'timeout'
+REDIRECT = 'redirect'
+NOT_FOUND = 'not-found'
+RATE_LIMITED = 'rate-limited'
+MISSING = 'missing'  # Page loaded but no count could be read
+CRASHED = 'crashed'  # The browser session died
+ERROR = 'error'
+
+# Redirects and missing accounts will not fix themselves, everything else may
+PERMANENT = {REDIRECT, NOT_FOUND}
+
+BACKOFF_BASE = 2.0
+RATE_LIMIT_BACKOFF_BASE = 30.0
+BACKOFF_CAP = 300.0
+
+
+class ScrapeError(Exception):
+    """A failed scrape attempt, tagged with the kind of failure."""
+
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+def classify_error(error):
+    """Map an exception from a scrape attempt to a failure kind."""
+    if isinstance(error, ScrapeError):
+        return error.kind
+    if isinstance(error, TimeoutException):
+        return TIMEOUT
+    if isinstance(error, WebDriverException):
+        message = str(error).lower()
+        if 'invalid session id' in message or 'chrome not reachable' in message or 'disconnected' in message:
+            return CRASHED
+        if 'timeout' in message:
+            return TIMEOUT
+    return ERROR
+
+def check_page(driver, not_found_markers=(), rate_limit_markers=()):
+    """Raise a ScrapeError if the loaded page says the account is missing or we are blocked."""
+    try:
+        text = driver.execute_script(
+            "return (document.title + ' ' + (document.body ? document.body.textContent.slice(0, 5000) : ''))")
+    except WebDriverException:
+        return
+    text = (text or '').lower()
+    for marker in not_found_markers:
+        if marker.lower() in text:
+            raise ScrapeError(NOT_FOUND, f"Page says: {marker}")
+    for marker in rate_limit_markers:
+        if marker.lower() in text:
+            raise ScrapeError(RATE_LIMITED, f"Page says: {marker}")
+
+def backoff_delay(attempt, kind):
+    """Exponential backoff with jitter; rate limits back off from a much larger base."""
+    base = RATE_LIMIT_BACKOFF_BASE if kind == RATE_LIMITED else BACKOFF_BASE
+    return min(BACKOFF_CAP, base * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+class RetryQueue:
+    """Thread-safe work queue where retried items only become available after their backoff.
+
+    get() blocks until an item is ready and returns None once the queue is
+    empty and no item is still being worked on (and so could be retried).
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def put(self, index, item, attempt=0, delay=0.0):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._seq, index, item, attempt))
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    _, _, index, item, attempt = heapq.heappop(self._heap)
+                    self._in_flight += 1
+                    return index, item, attempt
+                if not self._heap and self._in_flight == 0:
+                    return None
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+
+    def task_done(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
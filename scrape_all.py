@@ -0,0 +1,143 @@
+import sys
+import argparse
+import datetime
+import threading
+
+from airtable_client import iter_airtable_pages, not_blank_formula, update_records, WRITE_BATCH_SIZE
+from checkpoint import Checkpoint, JournaledWriter, checkpoint_path
+from handles import canonical_handle
+from change_filter import ChangeFilter
+from platforms import PLATFORMS, load_scraper
+from scrape_args import add_browser_arguments, browser_kwargs
+
+
+class RecordMerger:
+    """Collects every platform's count for a record and queues one merged update.
+
+    A record is handed to the writer as soon as all of its platforms have
+    reported, so a row with four handles costs one PATCH instead of four.
+    Counts the changes filter says Airtable already holds are left out.
+    """
+
+    def __init__(self, page, platforms, writer, changes):
+        self.writer = writer
+        self.changes = changes
+        self.handles = {}  # (platform, username) -> [record ids]
+        self.pending = {}  # record id -> platforms still being scraped
+        self.fields = {}  # record id -> merged follower fields
+        self._lock = threading.Lock()
+
+        for record in page:
+            for platform in platforms:
+                # URLs, @handles and case variants of one handle collapse into one fetch
+                username = canonical_handle(platform, record.get('fields', {}).get(PLATFORMS[platform]['username_field']))
+                followers_field = PLATFORMS[platform]['followers_field']
+                changes.add(record['id'], followers_field, record.get('fields', {}).get(followers_field))
+                if username:
+                    self.handles.setdefault((platform, username), []).append(record['id'])
+                    self.pending.setdefault(record['id'], set()).add(platform)
+
+    def usernames(self, platform):
+        """Distinct handles to scrape for a platform on this page."""
+        return sorted(username for handle_platform, username in self.handles if handle_platform == platform)
+
+    def add_result(self, platform, result):
+        followers_field = PLATFORMS[platform]['followers_field']
+        count = result['follower_count']
+        with self._lock:
+            for record_id in self.handles.get((platform, result['username']), []):
+                if count is not None and self.changes.should_write(record_id, followers_field, count):
+                    self.fields.setdefault(record_id, {})[followers_field] = int(count)
+                self.pending[record_id].discard(platform)
+                if not self.pending[record_id] and record_id in self.fields:
+                    self.writer.put({'id': record_id, 'fields': self.fields.pop(record_id)})
+
+    def flush(self):
+        """Queue records whose platforms never all reported (e.g. a worker died)."""
+        with self._lock:
+            for record_id, fields in self.fields.items():
+                self.writer.put({'id': record_id, 'fields': fields})
+            self.fields.clear()
+
+def scrape_platform(platform, usernames, merger, checkpoint, args, results):
+    # Handles finished before a crash are merged again from the checkpoint; the
+    # record's update may not have been queued yet when the run died
+    for username in usernames:
+        if checkpoint.is_done(platform, username):
+            result = checkpoint.completed[(platform, username)]
+            results[platform].append(result)
+            merger.add_result(platform, result)
+    usernames = [username for username in usernames if not checkpoint.is_done(platform, username)]
+    if not usernames:
+        return
+
+    def on_result(result):
+        merger.add_result(platform, result)
+        checkpoint.record_result(platform, result)
+
+    scraper = load_scraper(platform)
+    kwargs = browser_kwargs(args, platform)
+    try:
+        results[platform].extend(scraper.get_follower_counts(usernames, on_result=on_result, **kwargs))
+    except Exception as e:
+        print(f"[{platform}] Error scraping: {str(e)}")
+
+def run(platforms, args):
+    fields = [PLATFORMS[platform]['username_field'] for platform in platforms]
+    followers_fields = [PLATFORMS[platform]['followers_field'] for platform in platforms]
+    changes = ChangeFilter(args.min_delta)
+    results = {platform: [] for platform in platforms}
+    record_count = 0
+
+    checkpoint = Checkpoint(args.checkpoint, resume=args.resume)
+    writer = JournaledWriter(update_records, checkpoint, key=lambda update: update['id'],
+                             batch_size=WRITE_BATCH_SIZE).start()
+    print("Fetching Politicians from Airtable...")
+    try:
+        for page in iter_airtable_pages(fields=fields + followers_fields, formula=not_blank_formula(*fields)):
+            record_count += len(page)
+            print(f"\nFetched {len(page)} records ({record_count} so far)")
+            merger = RecordMerger(page, platforms, writer, changes)
+
+            # All platforms for this page are scraped at the same time
+            threads = [threading.Thread(target=scrape_platform,
+                                        args=(platform, merger.usernames(platform), merger, checkpoint, args, results))
+                       for platform in platforms if merger.usernames(platform)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            merger.flush()
+    except Exception as e:
+        print(f"Error fetching Airtable records: {str(e)}")
+
+    success_count = writer.close()
+    checkpoint.close()
+
+    if not record_count:
+        print("No usernames found in Airtable")
+        sys.exit(1)
+
+    print("\nFinal Results:")
+    print("-" * 50)
+    for platform in platforms:
+        found = [result for result in results[platform] if result['follower_count'] is not None]
+        failed = [result['username'] for result in results[platform] if result['follower_count'] is None]
+        print(f"\n{platform}: {len(found)}/{len(results[platform])} profiles scraped")
+        if failed:
+            print(f"  Not found: {', '.join(failed)}")
+
+    changes.report()
+    print(f"\nTimestamp: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Successfully updated {success_count} out of {writer.submitted} records in Airtable")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape follower counts for every platform in one run")
+    parser.add_argument('--platforms', nargs='+', choices=list(PLATFORMS), default=list(PLATFORMS))
+    add_browser_arguments(parser)
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the last run from its checkpoint and replay unwritten updates")
+    parser.add_argument('--checkpoint', default=checkpoint_path('all'), help="Checkpoint journal file")
+    args = parser.parse_args()
+
+    run(args.platforms, args)
@@ -0,0 +1,42 @@
+from driver_pool import default_pool_size
+from platforms import PLATFORMS
+from resource_blocking import PAGE_LOAD_STRATEGIES, DEFAULT_PAGE_LOAD_STRATEGY
+from result_cache import DEFAULT_TTL_HOURS
+
+
+def add_browser_arguments(parser, fetch_mode=True):
+    """Add the scraping, Chrome and write flags every entry point shares.
+
+    fetch_mode=False leaves out --fetch-mode, for scrapers without an HTTP tier.
+    """
+    parser.add_argument('--workers', type=int, default=default_pool_size(),
+                        help="Number of parallel Chrome workers per platform")
+    if fetch_mode:
+        parser.add_argument('--fetch-mode', choices=['tiered', 'browser'], default='tiered',
+                            help="Try plain HTTP before Chrome (tiered) or always use Chrome (browser)")
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL_HOURS,
+                        help="Skip profiles scraped within this many hours (0 disables the cache)")
+    parser.add_argument('--page-load', choices=PAGE_LOAD_STRATEGIES, default=DEFAULT_PAGE_LOAD_STRATEGY,
+                        help="Return from page loads at DOMContentLoaded (eager) or after every resource (normal)")
+    parser.add_argument('--no-block-resources', dest='block_resources', action='store_false',
+                        help="Load images, media, fonts and trackers instead of blocking them")
+    parser.add_argument('--headless', action='store_true',
+                        help="Run Chrome headless with a small viewport and low-memory flags (for servers)")
+    parser.add_argument('--network-stats', action='store_true',
+                        help="Log Chrome's network traffic and report bytes per page (adds a round trip per page)")
+    parser.add_argument('--min-delta', type=int, default=0,
+                        help="Only write counts that moved by at least this much (unchanged counts are never written)")
+
+def browser_kwargs(args, platform):
+    """Return the get_follower_counts keyword arguments for the flags add_browser_arguments added."""
+    kwargs = {
+        'workers': args.workers,
+        'cache_ttl': args.cache_ttl,
+        'page_load_strategy': args.page_load,
+        'block_resources': args.block_resources,
+        'headless': args.headless,
+        'network_stats': args.network_stats,
+    }
+    if PLATFORMS[platform]['static_html']:
+        kwargs['fetch_mode'] = args.fetch_mode
+    return kwargs
@@ -0,0 +1,146 @@
+import time
+import datetime
+
+from driver_pool import run_driver_pool
+from driver_factory import release_driver, discard_driver, prewarm_drivers
+from http_fetch import fetch_soup, run_tiered, TierStats
+from result_cache import split_cached, merge_cached
+from history_store import record_history
+from resource_blocking import TRANSFER_STATS, DEFAULT_PAGE_LOAD_STRATEGY
+from strategy_stats import STRATEGY_STATS
+from page_ready import READINESS_STATS
+from platforms import PLATFORMS
+
+
+def fetch_static_profile(platform, username, timestamp, extract_from_html):
+    """Try to read the count from the profile's HTML without starting a browser.
+
+    extract_from_html(soup) returns (count, raw_text, method) or (None, None, None).
+    """
+    start = time.perf_counter()
+    soup = fetch_soup(PLATFORMS[platform]['url'].format(username=username))
+    fetch_time = time.perf_counter() - start
+    if soup is None:
+        return None
+    follower_count, raw_text, method = extract_from_html(soup)
+    if follower_count is None:
+        return None
+    print(f"Read {platform} count for {username} over HTTP: {follower_count:,.0f}")
+    return {
+        'username': username,
+        'follower_count': follower_count,
+        'timestamp': timestamp,
+        'error': None,
+        'raw_text': raw_text,
+        'method': method,
+        'fetch_time': round(fetch_time, 3)
+    }
+
+def scrape_counts(platform, usernames, scrape_profile, build_chrome_options, create_driver,
+                  extract_from_html=None, max_retries=2, workers=1, fetch_mode='tiered', on_result=None,
+                  cache_ttl=None, page_load_strategy=DEFAULT_PAGE_LOAD_STRATEGY, block_resources=True,
+                  headless=False, network_stats=False):
+    """Scrape counts for usernames with a platform's scrape_profile; returns results in usernames order.
+
+    scrape_profile(driver, index, username, total_users, timestamp) makes one
+    attempt and raises ScrapeError when the count cannot be read. With
+    extract_from_html and fetch_mode 'tiered', each profile is first fetched
+    over plain HTTP and only the misses go to the Chrome workers; 'browser'
+    mode sends every profile to Chrome. on_result, if given, is called with
+    each result as soon as it is produced. With cache_ttl (hours), profiles
+    scraped more recently than that are served from the local cache and their
+    cached results passed to on_result. block_resources drops images, media,
+    fonts and trackers in the browser and network_stats reports bytes per page
+    (see resource_blocking). headless runs Chrome with the low-memory server
+    profile from driver_factory.
+    """
+    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cache, cached, pending = split_cached(platform, usernames, cache_ttl)
+    # Cached counts go to on_result too, so a write that failed on an earlier run is
+    # retried; ChangeFilter drops the ones Airtable already has
+    if on_result:
+        for result in cached.values():
+            on_result(result)
+
+    def report(result):
+        if result is not None:
+            if cache:
+                cache.store(platform, result)
+            # Fresh scrapes only; cached results are already in the history
+            record_history(platform, result)
+            if on_result:
+                on_result(result)
+        return result
+
+    def run_browser(pending):
+        total_users = len(pending)
+
+        def work(driver, index, username):
+            try:
+                return report(scrape_profile(driver, index + 1, username, total_users, timestamp))
+            finally:
+                if network_stats:
+                    TRANSFER_STATS.collect(driver, platform)
+
+        def fail(index, username, error, kind):
+            print(f"Failed to process {username} after retries: {kind}: {str(error)}")
+            return report({
+                'username': username,
+                'follower_count': None,
+                'timestamp': timestamp,
+                'error': f"{kind}: {str(error)}"
+            })
+
+        prewarm_drivers(build_chrome_options(page_load_strategy, headless, network_stats),
+                        min(workers, len(pending)), disposable_profile=headless)
+        results = run_driver_pool(pending,
+                                  lambda: create_driver(page_load_strategy, block_resources, headless, network_stats),
+                                  work, workers, release_driver, max_attempts=max_retries, on_failure=fail,
+                                  discard_driver=discard_driver)
+        READINESS_STATS.report(platform)
+        TRANSFER_STATS.report(platform)
+        STRATEGY_STATS.report(platform)
+        STRATEGY_STATS.save()
+        return results
+
+    if not pending:
+        results = []
+    elif extract_from_html is None or fetch_mode == 'browser':
+        results = run_browser(pending)
+    else:
+        stats = TierStats()
+        results = run_tiered(pending,
+                             lambda username: report(fetch_static_profile(platform, username, timestamp,
+                                                                          extract_from_html)),
+                             run_browser, stats)
+        stats.report()
+
+    # Keep results aligned with usernames even if a worker died mid-run; blank handles are dropped
+    results = [result if result is not None or not username else {
+                   'username': username,
+                   'follower_count': None,
+                   'timestamp': timestamp,
+                   'error': "No result"
+               } for result, username in zip(results, pending)]
+    results = merge_cached(usernames, cached, results)
+    return [result for result in results if result is not None]
+
+def plan_page(platform, rows, plan, changes, checkpoint, queue_update):
+    """Register a page of (record_id, handle, current count) rows for a scraper's run.
+
+    Each canonical handle is loaded once: records repeating a handle an earlier
+    page loaded get its result through queue_update(result, [record_id]).
+    Handles finished before a crash are taken from the checkpoint. Returns
+    (handles still to scrape, checkpointed results).
+    """
+    rows = list(rows)
+    for record_id, _, current in rows:
+        changes.add(record_id, PLATFORMS[platform]['followers_field'], current)
+    usernames, answered = plan.add_page((record_id, username) for record_id, username, _ in rows)
+    for record_id, result in answered:
+        queue_update(result, [record_id])
+    done = [checkpoint.completed[(platform, username)] for username in usernames
+            if checkpoint.is_done(platform, username)]
+    for result in done:
+        plan.record_result(result)
+    return [username for username in usernames if not checkpoint.is_done(platform, username)], done
@@ -1,21 +1,19 @@
 import sys
 import subprocess
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_factory import resolve_driver_path, create_driver
 
 def setup_chromedriver():
     print("Setting up ChromeDriver...")
     try:
-        # Try to install ChromeDriver
-        driver_path = ChromeDriverManager().install()
+        # Resolve ChromeDriver again and refresh the cached path used by the scrapers
+        driver_path = resolve_driver_path(refresh=True)
         print(f"ChromeDriver installed successfully at: {driver_path}")
-        
+
         # Test the installation
-        service = Service(driver_path)
         options = webdriver.ChromeOptions()
         options.add_argument('--headless')  # Run in headless mode for testing
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = create_driver(options)
         driver.quit()
         print("ChromeDriver setup completed successfully!")
         return True
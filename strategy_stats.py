@@ -0,0 +1,95 @@
+import os
+import json
+import atexit
+import threading
+
+# Success and latency of every extraction strategy, kept between runs
+STATS_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'socialscraper', 'strategy_stats.json')
+
+
+class StrategyStats:
+    """Per-platform success rate and latency of each extraction strategy.
+
+    order() puts the strategy with the lowest expected time-to-success
+    first, so a selector that stopped matching sinks to the back instead of
+    costing a browser round trip on every profile. Strategies with no
+    history are scored with a neutral prior and keep their listed order.
+    Stats only reorder strategies of equal precision: see set_precision().
+    """
+
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.stats = {}  # platform -> strategy -> {'attempts', 'successes', 'seconds'}
+        self.precision = {}  # platform -> strategy -> tier, 0 being the most precise
+        try:
+            with open(path) as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def set_precision(self, platform, tiers):
+        """Group a platform's strategies into tiers, most precise first.
+
+        A strategy in a later tier is never tried before one in an earlier
+        tier, however fast it is: a loose match that finds some other number
+        would otherwise rank first and be recorded as a success. Strategies
+        not listed are in the first tier.
+        """
+        with self._lock:
+            self.precision[platform] = {strategy: tier for tier, names in enumerate(tiers) for strategy in names}
+
+    def record(self, platform, strategy, success, seconds):
+        with self._lock:
+            entry = self.stats.setdefault(platform, {}).setdefault(
+                strategy, {'attempts': 0, 'successes': 0, 'seconds': 0.0})
+            entry['attempts'] += 1
+            entry['successes'] += 1 if success else 0
+            entry['seconds'] += seconds
+            self._dirty = True
+
+    def _cost(self, entry, default_latency):
+        # Expected seconds spent per success, with a one-in-two prior
+        attempts = entry['attempts'] if entry else 0
+        latency = entry['seconds'] / attempts if attempts else default_latency
+        success_rate = ((entry['successes'] if entry else 0) + 1) / (attempts + 2)
+        return latency / success_rate
+
+    def order(self, platform, strategies, key=lambda strategy: strategy):
+        """Return strategies sorted by precision tier, then cheapest first; key(strategy) gives its name."""
+        with self._lock:
+            known = self.stats.get(platform, {})
+            tiers = self.precision.get(platform, {})
+            latencies = [entry['seconds'] / entry['attempts'] for entry in known.values() if entry['attempts']]
+            default_latency = sum(latencies) / len(latencies) if latencies else 0.0
+            costs = {key(strategy): self._cost(known.get(key(strategy)), default_latency) for strategy in strategies}
+        return sorted(strategies, key=lambda strategy: (tiers.get(key(strategy), 0), costs[key(strategy)]))
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(self.stats, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                print(f"Could not save strategy stats: {str(e)}")
+
+    def report(self, platform):
+        with self._lock:
+            entries = dict(self.stats.get(platform, {}))
+        if not entries:
+            return
+        print(f"\nExtraction strategies ({platform}), in the order they will be tried next:")
+        for strategy in self.order(platform, list(entries)):
+            entry = entries[strategy]
+            print(f"  {strategy:<50} {entry['successes']:>6}/{entry['attempts']:<6} hits "
+                  f"{entry['seconds'] / max(entry['attempts'], 1) * 1000:>8.1f}ms avg")
+
+STRATEGY_STATS = StrategyStats()
+atexit.register(STRATEGY_STATS.save)
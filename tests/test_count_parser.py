@@ -0,0 +1,75 @@
+import os
+import sys
+
+# Run from anywhere: the scrapers live one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from count_parser import FOLLOWERS_LABEL, SUBSCRIBERS_LABEL, parse_count, parse_counts
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2,771', 2771),
+    ('950', 950),
+    ('10K', 10000),
+    ('1.5k', 1500),
+    ('1.2M', 1200000),
+    ('1.15M subscribers', 1150000),
+    ('2.5B', 2500000000),
+    ('1.234M', 1234000),
+    ('1,234 Mio.', 1234000),
+    ('12.345K', 12345),
+    ('3 million people follow this', 3000000),
+])
+def test_suffixes(text, expected):
+    assert parse_count(text) == expected
+
+@pytest.mark.parametrize('text, expected', [
+    ('1.234.567 Follower', 1234567),
+    ('1,2 Mio. Abonnenten', 1200000),
+    ('12\u00a0345 abonn\u00e9s', 12345),
+    ("1'234 Follower", 1234),
+    ('1\u202f234\u202f567', 1234567),
+    ('3,5 Mrd', 3500000000),
+    ('12 345 followers', 12345),
+    ('1 234 567', 1234567),
+])
+def test_locale_separators(text, expected):
+    assert parse_count(text) == expected
+
+def test_label_skips_other_numbers():
+    text = 'Joined 2009 | 1,234 Following | 5.6K Followers'
+    assert parse_count(text) == 2009
+    assert parse_count(text, FOLLOWERS_LABEL) == 5600
+    assert parse_count('12 videos | 1 subscriber', SUBSCRIBERS_LABEL) == 1
+    assert parse_count('1.2M views', SUBSCRIBERS_LABEL) is None
+    assert parse_count('12 345 followers', FOLLOWERS_LABEL) == 12345
+    assert parse_count('12 videos 345 subscribers', SUBSCRIBERS_LABEL) == 345
+
+def test_thousands_groups_without_suffix():
+    assert parse_count('1.234') == 1234
+    assert parse_count('1,234,567') == 1234567
+    assert parse_count('1234.567') == 1234
+
+@pytest.mark.parametrize('text', [None, '', 'no count here'])
+def test_missing_counts(text):
+    assert parse_count(text) is None
+
+def test_parse_counts_matches_parse_count():
+    texts = ['2,771 Followers', '1.2M', None, 'no count here', '1,2 Mio.', '1.234M', '12 345', '1.2M']
+    counts = parse_counts(texts)
+    assert str(counts.dtype) == 'Int64'
+    assert [None if pd.isna(count) else count for count in counts] == [parse_count(text) for text in texts]
+
+def test_parse_counts_keeps_index():
+    texts = pd.Series(['10K Followers', pd.NA, '5 followers', '10K Followers'], index=['d', 'b', 'a', 'c'])
+    counts = parse_counts(texts, FOLLOWERS_LABEL)
+    assert list(counts.index) == ['d', 'b', 'a', 'c']
+    assert counts['d'] == 10000 and counts['c'] == 10000 and counts['a'] == 5
+    assert pd.isna(counts['b'])
+
+def test_parse_counts_empty():
+    counts = parse_counts([])
+    assert counts.empty and str(counts.dtype) == 'Int64'
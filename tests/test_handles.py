@@ -0,0 +1,86 @@
+import os
+import sys
+
+# Run from anywhere: the scrapers live one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from handles import ScrapePlan, canonical_handle
+
+
+@pytest.mark.parametrize('platform, raw, expected', [
+    # Plain handles and @handles
+    ('twitter', 'jack', 'jack'),
+    ('twitter', '@Jack ', 'jack'),
+    ('twitter', 'jack/', 'jack'),
+    ('instagram', '@nasa', 'nasa'),
+    ('youtube', '@MrBeast', 'mrbeast'),
+    # Profile URLs, with or without a scheme
+    ('twitter', 'https://twitter.com/Jack', 'jack'),
+    ('twitter', 'https://x.com/jack/status/20', 'jack'),
+    ('twitter', 'mobile.twitter.com/jack?lang=en', 'jack'),
+    ('instagram', 'https://www.instagram.com/nasa/?hl=en', 'nasa'),
+    ('instagram', 'instagram.com/nasa#top', 'nasa'),
+    ('youtube', 'https://www.youtube.com/@MrBeast/videos', 'mrbeast'),
+    ('youtube', 'youtube.com/c/MrBeast', 'mrbeast'),
+    ('youtube', 'https://youtube.com/user/MrBeast', 'mrbeast'),
+    ('facebook', 'https://www.facebook.com/NASA/', 'nasa'),
+    ('facebook', 'fb.com/pg/nasa/about', 'nasa'),
+    # Numeric Facebook profiles
+    ('facebook', 'https://www.facebook.com/profile.php?id=100012345', 'profile.php?id=100012345'),
+    ('facebook', 'profile.php?id=100012345', 'profile.php?id=100012345'),
+    ('facebook', 'facebook.com/pages/Some-Page/123456', 'profile.php?id=123456'),
+    ('facebook', 'https://facebook.com/people/Jane-Doe/100099/', 'profile.php?id=100099'),
+])
+def test_canonical_handle(platform, raw, expected):
+    assert canonical_handle(platform, raw) == expected
+
+@pytest.mark.parametrize('platform, raw', [
+    # Posts, videos and site pages are not profiles
+    ('youtube', 'https://www.youtube.com/channel/UCX6OQ3DkcsbYNE6H8uQQuVA'),
+    ('youtube', 'youtube.com/watch?v=dQw4w9WgXcQ'),
+    ('youtube', 'https://www.youtube.com/shorts/abc123'),
+    ('youtube', 'https://youtu.be/dQw4w9WgXcQ'),
+    ('youtube', 'youtu.be/dQw4w9WgXcQ'),
+    ('instagram', 'https://www.instagram.com/p/Cabc123/'),
+    ('instagram', 'instagram.com/reel/Cabc123'),
+    ('instagram', 'instagram.com/explore/tags/cats'),
+    ('twitter', 'https://twitter.com/intent/follow?screen_name=jack'),
+    ('twitter', 'https://x.com/i/lists/123'),
+    ('twitter', 'x.com/search?q=jack'),
+    ('facebook', 'https://www.facebook.com/pages/Some-Page'),
+    ('facebook', 'facebook.com/groups/12345'),
+    ('facebook', 'facebook.com/profile.php'),
+    ('facebook', 'https://www.facebook.com/watch/?v=123'),
+    # Not a handle at all
+    ('twitter', ''),
+    ('twitter', None),
+    ('twitter', 'https://example.com/jack'),
+    ('twitter', 'a_handle_much_too_long'),
+    ('twitter', 'jack smith'),
+    ('youtube', 'ab'),
+])
+def test_rejected_handles(platform, raw):
+    assert canonical_handle(platform, raw) is None
+
+def test_scrape_plan_fetches_each_handle_once():
+    plan = ScrapePlan('instagram')
+    handles, answered = plan.add_page([('rec1', '@NASA'), ('rec2', 'instagram.com/nasa'),
+                                       ('rec3', 'instagram.com/p/Cabc123'), ('rec4', 'esa')])
+    assert handles == ['nasa', 'esa']
+    assert answered == []
+    assert plan.invalid == [('rec3', 'instagram.com/p/Cabc123')]
+    assert sorted(plan.record_ids('nasa')) == ['rec1', 'rec2']
+
+def test_scrape_plan_answers_later_pages_from_results():
+    plan = ScrapePlan('instagram')
+    plan.add_page([('rec1', 'nasa'), ('rec2', 'esa')])
+    result = {'username': 'nasa', 'follower_count': 100}
+    plan.record_result(result)
+    plan.record_result({'username': 'esa', 'follower_count': None})
+    handles, answered = plan.add_page([('rec3', 'https://instagram.com/NASA/'), ('rec4', '@esa'), ('rec5', 'jaxa')])
+    assert handles == ['jaxa']
+    assert answered == [('rec3', result)]
+    assert plan.rows == 5
+    assert plan.saved == 2
@@ -0,0 +1,106 @@
+import os
+import sys
+
+# Run from anywhere: the scrapers live one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from work_queue import MAX_LEASES, QueueWriter, WorkQueue
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'queue.sqlite3')
+
+def make_queue(path, worker_id, lease_seconds=300):
+    return WorkQueue('job', path, worker_id=worker_id, lease_seconds=lease_seconds)
+
+def test_enqueue_counts_new_handles(path):
+    queue = make_queue(path, 'a')
+    assert queue.enqueue('twitter', [('rec1', 'jack', 10), ('rec2', 'jack', 10), ('rec3', 'bob', None)]) == 2
+    assert queue.enqueue('twitter', [('rec4', 'bob', 5)]) == 0
+    assert queue.progress() == {'twitter': {'pending': 2}}
+
+def test_lease_hands_each_handle_out_once(path):
+    first, second = make_queue(path, 'a'), make_queue(path, 'b')
+    first.enqueue('twitter', [('rec1', 'a1', None), ('rec2', 'a2', None), ('rec3', 'a3', None)])
+    assert first.lease('twitter', limit=2) == ['a1', 'a2']
+    assert second.lease('twitter', limit=2) == ['a3']
+    assert second.lease('twitter') == []
+    assert first.remaining('twitter') == 3
+    assert first.leased('twitter') == ['a1', 'a2']
+
+def test_complete_returns_records_and_finishes_handle(path):
+    queue = make_queue(path, 'a')
+    queue.enqueue('twitter', [('rec1', 'jack', 10), ('rec2', 'jack', 12)])
+    queue.lease('twitter')
+    rows = queue.complete('twitter', {'username': 'jack', 'follower_count': 20})
+    assert sorted(rows) == [('rec1', 10), ('rec2', 12)]
+    assert queue.progress() == {'twitter': {'done': 1}}
+    assert queue.remaining('twitter') == 0
+
+def test_failed_result_and_fail_mark_handles_failed(path):
+    queue = make_queue(path, 'a')
+    queue.enqueue('twitter', [('rec1', 'gone', None), ('rec2', 'lost', None)])
+    queue.lease('twitter')
+    queue.complete('twitter', {'username': 'gone', 'follower_count': None})
+    queue.fail('twitter', queue.leased('twitter'))
+    assert queue.progress() == {'twitter': {'failed': 2}}
+
+def test_expired_lease_goes_to_next_worker(path):
+    dead = make_queue(path, 'dead', lease_seconds=-1)
+    alive = make_queue(path, 'alive')
+    dead.enqueue('twitter', [('rec1', 'jack', None)])
+    assert dead.lease('twitter') == ['jack']
+    assert alive.lease('twitter') == ['jack']
+    assert dead.leased('twitter') == []
+    assert alive.leased('twitter') == ['jack']
+
+def test_live_lease_is_not_taken(path):
+    holder, other = make_queue(path, 'holder'), make_queue(path, 'other')
+    holder.enqueue('twitter', [('rec1', 'jack', None)])
+    holder.lease('twitter')
+    holder.heartbeat()
+    assert other.lease('twitter') == []
+
+def test_handle_given_up_after_max_leases(path):
+    queue = make_queue(path, 'a', lease_seconds=-1)
+    queue.enqueue('twitter', [('rec1', 'jack', None)])
+    for _ in range(MAX_LEASES):
+        assert queue.lease('twitter') == ['jack']
+    assert queue.lease('twitter') == []
+    assert queue.progress() == {'twitter': {'failed': 1}}
+
+def test_release_returns_leases_without_counting_them(path):
+    queue = make_queue(path, 'a')
+    queue.enqueue('twitter', [('rec1', 'jack', None)])
+    queue.heartbeat()
+    queue.lease('twitter')
+    queue.release()
+    assert queue.progress() == {'twitter': {'pending': 1}}
+    assert queue.workers() == []
+    expiring = make_queue(path, 'b', lease_seconds=-1)
+    for _ in range(MAX_LEASES):
+        assert expiring.lease('twitter') == ['jack']
+
+def test_unwritten_updates_are_claimed_from_dead_workers(path):
+    dead, alive = make_queue(path, 'dead'), make_queue(path, 'alive')
+    dead.save_write({'id': 'rec1', 'fields': {'twitter_followers': 20}})
+    dead.save_write({'id': 'rec2', 'fields': {'twitter_followers': 30}})
+    dead.forget_writes([{'id': 'rec2', 'fields': {'twitter_followers': 30}}])
+    assert dead.unwritten() == 1
+    dead.heartbeat()
+    assert alive.claim_writes() == []
+    dead.release()
+    assert alive.claim_writes() == [{'id': 'rec1', 'fields': {'twitter_followers': 20}}]
+    assert alive.claim_writes() == []
+
+def test_queue_writer_forgets_only_written_updates(path):
+    queue = make_queue(path, 'a')
+    writer = QueueWriter(lambda batch: [update['id'] != 'bad' for update in batch], queue).start()
+    writer.put({'id': 'good', 'fields': {'twitter_followers': 1}})
+    writer.put({'id': 'bad', 'fields': {'twitter_followers': 2}})
+    assert writer.close() == 1
+    assert queue.unwritten() == 1
+    assert make_queue(path, 'b').claim_writes() == [{'id': 'bad', 'fields': {'twitter_followers': 2}}]
@@ -1,6 +1,5 @@
 import sys
 import subprocess
-import datetime
 import pandas as pd
 
 def install_requirements():
@@ -26,333 +25,260 @@ if __name__ == '__main__':
 
 # Now import all required packages
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 import time
 import random
-import requests
 import json
-import re
+import argparse
 
-# Airtable configuration
-AIRTABLE_PAT = "patC3CJ296jcbbAMd.e12065cdff24c5b8e6ed1e9315fa4f5a9233ee9803efd602a7a2a74ff14c5057"
-AIRTABLE_BASE_ID = "appdeZcAttBaG5oVI"
-AIRTABLE_TABLE_NAME = "Politicians"
+from retry_scheduler import ScrapeError, check_page, REDIRECT, MISSING
+from driver_factory import acquire_driver, apply_headless_profile
+from airtable_client import iter_airtable_pages, not_blank_formula, update_records, WRITE_BATCH_SIZE
+from checkpoint import Checkpoint, JournaledWriter, checkpoint_path
+from handles import ScrapePlan
+from change_filter import ChangeFilter
+from resource_blocking import configure_options, apply_blocking, DEFAULT_PAGE_LOAD_STRATEGY
+from scrape_args import add_browser_arguments, browser_kwargs
+from scrape_run import scrape_counts, plan_page
+from count_parser import parse_count
+from page_ready import wait_until_ready
+
+PLATFORM = 'twitter'
 
 def wait_random():
     time.sleep(random.uniform(0.2, 0.5))  # Quick wait
 
-def parse_follower_count(text):
-    try:
-        # Remove any non-numeric characters except commas, decimal points, and K/M/B
-        text = text.strip()
-        # Extract just the number part if it's in a format like "2,771 Followers" or "100K Followers"
-        number_match = re.search(r'([\d,\.]+\s*[KMBkmb]?)\s*(?:Followers?)?', text)
-        if number_match:
-            number_str = number_match.group(1).strip()
-            
-            # Handle K, M, B suffixes
-            multiplier = 1
-            if number_str[-1].upper() == 'K':
-                multiplier = 1000
-                number_str = number_str[:-1]
-            elif number_str[-1].upper() == 'M':
-                multiplier = 1000000
-                number_str = number_str[:-1]
-            elif number_str[-1].upper() == 'B':
-                multiplier = 1000000000
-                number_str = number_str[:-1]
-            
-            # Remove commas and convert to float
-            number_str = number_str.replace(',', '')
-            return float(number_str) * multiplier
-    except Exception as e:
-        print(f"Error parsing follower count '{text}': {str(e)}")
-    return None
-
-def get_follower_counts(usernames, max_retries=3):
+def build_chrome_options(page_load_strategy=DEFAULT_PAGE_LOAD_STRATEGY, headless=False, network_stats=False):
     # Setup Chrome options
     options = webdriver.ChromeOptions()
     options.add_argument('--disable-gpu')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
+    if headless:
+        apply_headless_profile(options)
+    else:
+        options.add_argument('--window-size=1920,1080')
     options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
     
-    results = []
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    driver = None
-    
-    try:
-        print("Initializing Chrome driver...")
-        # Use a more reliable way to initialize Chrome
-        try:
-            service = Service()
-            driver = webdriver.Chrome(service=service, options=options)
-        except Exception as e:
-            print(f"Error with default service, trying ChromeDriverManager: {str(e)}")
-            try:
-                service = Service(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=service, options=options)
-            except Exception as e:
-                print(f"Error with ChromeDriverManager: {str(e)}")
-                # Try one more time with default Chrome location
-                service = Service("chromedriver.exe")
-                driver = webdriver.Chrome(service=service, options=options)
-        
-        driver.set_page_load_timeout(10)  # 10 second timeout
-        
-        for username in usernames:
-            retries = 0
-            follower_count = None
-            
-            while retries < max_retries:
-                try:
-                    print(f"\nProcessing @{username} (attempt {retries + 1})...")
-                    url = f'https://twitter.com/{username}'
-                    
-                    try:
-                        driver.get(url)
-                        
-                        # Try to grab data as soon as we see any content
-                        for _ in range(5):  # Try up to 5 quick attempts
-                            try:
-                                # Check for redirect
-                                if not driver.current_url.lower().endswith(username.lower()):
-                                    raise Exception("Redirect detected")
-                                
-                                # Quick check for any content
-                                page_info = driver.execute_script(r"""
-                                    function findFollowers() {
-                                        let results = [];
-                                        try {
-                                            // Function to clean and validate text
-                                            function isValidFollowerText(text) {
-                                                text = text.trim();
-                                                // Allow for K, M, B suffixes before "Followers"
-                                                return /^\d[\d,\.]*\s*[KMBkmb]?\s+Followers$/.test(text);
-                                            }
+    return configure_options(options, page_load_strategy, network_stats)
 
-                                            // Special handling for protected profiles
-                                            const allElements = document.querySelectorAll('*');
-                                            for (const elem of allElements) {
-                                                if (elem.tagName.toLowerCase() === 'span' || elem.tagName.toLowerCase() === 'div') {
-                                                    const text = elem.textContent.trim();
-                                                    // Look for numbers with optional K/M/B suffix
-                                                    if (/^[\d,\.]+\s*[KMBkmb]?$/.test(text)) {
-                                                        const nextElem = elem.nextElementSibling;
-                                                        if (nextElem && nextElem.textContent.trim() === 'Followers') {
-                                                            results.push({
-                                                                text: text + ' Followers',
-                                                                type: 'protected-stats'
-                                                            });
-                                                        }
-                                                    }
-                                                }
-                                            }
+def create_driver(page_load_strategy=DEFAULT_PAGE_LOAD_STRATEGY, block_resources=True, headless=False,
+                  network_stats=False):
+    """Get a warm Chrome session from the shared driver factory."""
+    driver = acquire_driver(build_chrome_options(page_load_strategy, headless, network_stats),
+                            disposable_profile=headless)
+    apply_blocking(driver, PLATFORM, block_resources)
+    driver.set_page_load_timeout(10)  # 10 second timeout
+    return driver
 
-                                            // If we haven't found anything, try the regular profile selectors
-                                            if (results.length === 0) {
-                                                // Try finding the followers link (not following)
-                                                const followerLinks = document.querySelectorAll('a[href$="/followers"]');
-                                                for (const link of followerLinks) {
-                                                    const text = link.textContent.trim();
-                                                    if (isValidFollowerText(text)) {
-                                                        results.push({
-                                                            text: text,
-                                                            type: 'link'
-                                                        });
-                                                    }
-                                                }
+# In-page extractor: returns a JSON list with the first {text, type} follower
+# candidate found. Lookups are scoped to the follower links and the profile
+# header so heavy timelines are never walked, and it returns on the first hit.
+FOLLOWERS_JS = r"""
+    const NUMBER = /^\d[\d,\.]*\s*[KMBkmb]?$/;
+    const LINK_TEXT = /^\d[\d,\.]*\s*[KMBkmb]?\s+Followers$/;
+    const found = (text, type) => JSON.stringify([{text: text, type: type}]);
+    try {
+        // Public profiles: the followers link carries the whole "1,234 Followers" text
+        const links = document.querySelectorAll('a[href$="/verified_followers"], a[href$="/followers"]');
+        for (const link of links) {
+            const text = link.textContent.trim();
+            if (LINK_TEXT.test(text)) {
+                return found(text, 'link');
+            }
+        }
 
-                                                // Look for specific number spans
-                                                const elements = document.querySelectorAll('span[dir="ltr"]');
-                                                let foundFollowing = false;
-                                                for (const elem of elements) {
-                                                    const text = elem.textContent.trim();
-                                                    if (/^\d[\d,\.]*$/.test(text)) {
-                                                        // Check if this is part of the stats section
-                                                        const parent = elem.parentElement;
-                                                        const nextElem = elem.nextElementSibling;
-                                                        
-                                                        // Skip if this is the "Following" count
-                                                        if (nextElem && nextElem.textContent.trim() === 'Following') {
-                                                            foundFollowing = true;
-                                                            continue;
-                                                        }
-                                                        
-                                                        // If we found Following before, this should be Followers
-                                                        if (foundFollowing && nextElem && nextElem.textContent.trim() === 'Followers') {
-                                                            results.push({
-                                                                text: text + ' Followers',
-                                                                type: 'stats'
-                                                            });
-                                                        }
-                                                    }
-                                                }
-                                            }
+        // Everything else lives in the profile header next to the user name
+        const userName = document.querySelector('[data-testid="UserName"]');
+        const header = userName ? userName.parentElement : null;
+        if (!header) {
+            return JSON.stringify([]);
+        }
 
-                                        } catch (e) {
-                                            console.error('Error finding followers:', e);
-                                        }
-                                        return JSON.stringify(results);
-                                    }
-                                    return findFollowers();
-                                """)
-                                
-                                if page_info:
-                                    elements = json.loads(page_info)
-                                    if elements:
-                                        print(f"\nFound {len(elements)} potential elements:")
-                                        for element in elements:
-                                            print("Element:", element)
-                                            if 'text' in element:
-                                                count = parse_follower_count(element['text'])
-                                                if count is not None:
-                                                    follower_count = count
-                                                    print(f"\nExtracted follower count: {count:,.0f}")
-                                                    raise StopIteration  # Break out of all loops
-                                
-                                time.sleep(0.5)  # Short wait between quick attempts
-                                
-                            except StopIteration:
-                                break  # Found the count, exit the quick attempt loop
-                            except Exception as e:
-                                if "Redirect detected" in str(e):
-                                    raise  # Re-raise redirect exception
-                                print(f"Quick attempt error: {str(e)}")
-                        
-                        # If we haven't found the count, wait for full page load
-                        if follower_count is None:
-                            wait = WebDriverWait(driver, 5)
-                            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-testid="primaryColumn"]')))
-                            time.sleep(2)
-                            
-                    except Exception as e:
-                        print(f"Page load/redirect error: {str(e)}")
-                        retries += 1
-                        if retries < max_retries:
-                            print(f"Retrying in 10 seconds... (attempt {retries + 1})")
-                            time.sleep(10)
-                        continue
-                    
-                    if follower_count is not None:
-                        results.append({
-                            'username': username,
-                            'follower_count': follower_count,
-                            'timestamp': timestamp
-                        })
-                        break  # Successfully got the count, no need for more retries
-                    
-                    retries += 1
-                    if retries < max_retries:
-                        print(f"\nNo follower count found. Waiting 10 seconds before retry... (attempt {retries + 1})")
-                        time.sleep(10)
-                        
-                except Exception as e:
-                    print(f"Error in attempt {retries + 1}: {str(e)}")
-                    retries += 1
-                    if retries < max_retries:
-                        print(f"\nRetrying in 10 seconds... (attempt {retries + 1})")
-                        time.sleep(10)
-            
-            if follower_count is None:
-                print(f"\nFailed to get follower count for @{username} after {max_retries} attempts")
-                results.append({
-                    'username': username,
-                    'follower_count': None,
-                    'timestamp': timestamp
-                })
-    
-    finally:
-        if driver:
-            driver.quit()
-    
-    return results
+        // Protected profiles: a "Followers" label right after the number, without a link
+        const labels = document.evaluate(".//span[normalize-space(text())='Followers']", header, null,
+                                         XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < labels.snapshotLength; i++) {
+            const label = labels.snapshotItem(i);
+            const candidates = [label.previousElementSibling,
+                                label.parentElement && label.parentElement.previousElementSibling];
+            for (const elem of candidates) {
+                if (elem && NUMBER.test(elem.textContent.trim())) {
+                    return found(elem.textContent.trim() + ' Followers', 'protected-stats');
+                }
+            }
+        }
 
-def get_airtable_records():
-    """Fetch records from Airtable."""
-    url = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}"
-    headers = {
-        "Authorization": f"Bearer {AIRTABLE_PAT}",
-        "Content-Type": "application/json"
+        // Bare number spans: the one after the "Following" count is the follower count
+        let foundFollowing = false;
+        for (const elem of header.querySelectorAll('span[dir="ltr"]')) {
+            const text = elem.textContent.trim();
+            const next = elem.nextElementSibling;
+            if (!/^\d[\d,\.]*$/.test(text) || !next) {
+                continue;
+            }
+            const label = next.textContent.trim();
+            if (label === 'Following') {
+                foundFollowing = true;
+            } else if (foundFollowing && label === 'Followers') {
+                return found(text + ' Followers', 'stats');
+            }
+        }
+    } catch (e) {
+        console.error('Error finding followers:', e);
     }
+    return JSON.stringify([]);
+"""
+
+# Ready once the follower count (linked or protected) or an error/empty state
+# is rendered, or the app has navigated away from the profile
+READY_JS = r"""
+    const path = location.pathname.toLowerCase().replace(/\/$/, '');
+    if (!path.endsWith('/' + %s)) { return true; }
+    if (document.querySelector('a[href$="/verified_followers"], a[href$="/followers"], '
+                               + '[data-testid="emptyState"], [data-testid="error-detail"]')) { return true; }
+    const userName = document.querySelector('[data-testid="UserName"]');
+    return !!(userName && userName.parentElement && userName.parentElement.textContent.includes('Followers'));
+"""
+READY_TIMEOUT = 8
+
+# Page text that means the handle will never resolve, or that Twitter is throttling us
+NOT_FOUND_MARKERS = ["This account doesn’t exist", "This account doesn't exist", "Account suspended"]
+RATE_LIMIT_MARKERS = ["Rate limit exceeded", "Something went wrong. Try reloading."]
+
+def read_follower_count(driver):
+    """Run the in-page extractor once and parse the first usable candidate.
+
+    Returns (count, raw_text, method) where method is the candidate type
+    (link, protected-stats or stats), or (None, None, None).
+    """
+    page_info = driver.execute_script(FOLLOWERS_JS)
+    if page_info:
+        elements = json.loads(page_info)
+        if elements:
+            print(f"\nFound {len(elements)} potential elements:")
+            for element in elements:
+                print("Element:", element)
+                if 'text' in element:
+                    count = parse_count(element['text'])
+                    if count is not None:
+                        print(f"\nExtracted follower count: {count:,.0f}")
+                        return count, element['text'], element.get('type')
+    return None, None, None
+
+def scrape_profile(driver, index, username, total_users, timestamp):
+    """Make one attempt at the follower count; raises ScrapeError when it cannot be read."""
+    print(f"\nProcessing @{username} ({index}/{total_users})...")
+    url = f'https://twitter.com/{username}'
+    start = time.perf_counter()
+    driver.get(url)
     
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        records = response.json().get('records', [])
-        return [(record['id'], record['fields'].get('twitter_user', '')) 
-                for record in records 
-                if record['fields'].get('twitter_user')]
-    except Exception as e:
-        print(f"Error fetching from Airtable: {str(e)}")
-        return []
+    # Replaces the old loop of 5 polls 0.5s apart and its fallback: up to 5s
+    # waiting for primaryColumn, then a fixed 2s sleep
+    wait_until_ready(driver, PLATFORM, READY_JS % json.dumps(username.lower()), READY_TIMEOUT,
+                     replaced_poll=0.5, replaced_polls=5, replaced_fallback_wait=5.0, replaced_fallback_sleep=2.0)
+    fetch_time = time.perf_counter() - start
+    if not driver.current_url.lower().rstrip('/').endswith(username.lower()):
+        raise ScrapeError(REDIRECT, f"Redirected to {driver.current_url}")
+    follower_count, raw_text, method = read_follower_count(driver)
+    
+    if follower_count is None:
+        check_page(driver, NOT_FOUND_MARKERS, RATE_LIMIT_MARKERS)
+        raise ScrapeError(MISSING, "No follower count found")
+    
+    return {
+        'username': username,
+        'follower_count': follower_count,
+        'timestamp': timestamp,
+        'raw_text': raw_text,
+        'method': method,
+        'fetch_time': round(fetch_time, 3)
+    }
+
+def get_follower_counts(usernames, max_retries=3, **kwargs):
+    """Scrape follower counts for usernames with a pool of Chrome workers; see scrape_run.scrape_counts."""
+    return scrape_counts(PLATFORM, usernames, scrape_profile, build_chrome_options, create_driver,
+                         max_retries=max_retries, **kwargs)
+
+def iter_airtable_records():
+    """Yield pages of (record_id, username, current count) from Airtable as they arrive."""
+    for page in iter_airtable_pages(fields=['twitter_user', 'twitter_followers'],
+                                    formula=not_blank_formula('twitter_user')):
+        yield [(record['id'], record['fields'].get('twitter_user', ''), record['fields'].get('twitter_followers'))
+               for record in page
+               if record['fields'].get('twitter_user')]
 
 def update_airtable_batch(updates):
-    """Update multiple records in Airtable in a single request."""
-    url = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}"
-    headers = {
-        "Authorization": f"Bearer {AIRTABLE_PAT}",
-        "Content-Type": "application/json"
-    }
-    
+    """Update multiple records in Airtable; returns one success flag per update."""
     records = [{"id": record_id, "fields": {"twitter_followers": count}} 
                for record_id, count in updates]
     
-    data = {
-        "records": records
-    }
-    
     try:
-        response = requests.patch(url, headers=headers, json=data)
-        response.raise_for_status()
-        print(f"Successfully updated batch of {len(updates)} records")
-        return True
+        return update_records(records)
     except Exception as e:
         print(f"Error updating batch in Airtable: {str(e)}")
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Twitter follower counts into Airtable")
+    add_browser_arguments(parser, fetch_mode=False)
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the last run from its checkpoint and replay unwritten updates")
+    parser.add_argument('--checkpoint', default=checkpoint_path(PLATFORM), help="Checkpoint journal file")
+    args = parser.parse_args()
+    
     print("Fetching Twitter usernames from Airtable...")
-    airtable_records = get_airtable_records()  # Get all records
+    airtable_records = []
+    plan = ScrapePlan(PLATFORM)
+    changes = ChangeFilter(args.min_delta)
+    results = []
     
-    if not airtable_records:
-        print("No Twitter usernames found in Airtable.")
-        exit()
+    # Results are journaled and written to Airtable, several batches of 10 at a time, while scraping continues
+    checkpoint = Checkpoint(args.checkpoint, resume=args.resume)
+    writer = JournaledWriter(update_airtable_batch, checkpoint, key=lambda update: update[0],
+                             batch_size=WRITE_BATCH_SIZE).start()
     
-    print(f"Found {len(airtable_records)} Twitter accounts to process...")
-    usernames = [username for _, username in airtable_records]
-    print("Processing usernames:", ", ".join(f"@{username}" for username in usernames))
-    print("\nStarting the scraping process...")
+    def queue_update(result, record_ids=None):
+        count = result['follower_count']
+        if count is None:
+            return
+        # Every record that lists this handle gets the count, once: ChangeFilter drops repeats
+        for record_id in record_ids or plan.record_ids(result['username']):
+            if changes.should_write(record_id, 'twitter_followers', count):
+                writer.put((record_id, int(count)))
     
-    results = get_follower_counts(usernames)
+    def on_result(result):
+        plan.record_result(result)
+        queue_update(result)
+        checkpoint.record_result(PLATFORM, result)
     
-    # Prepare updates in batches of 10
-    print("\nUpdating Airtable with follower counts...")
-    updates = []
-    success_count = 0
-    batch_size = 10
+    # Start scraping each page of records as soon as it arrives
+    try:
+        for page in iter_airtable_records():
+            airtable_records.extend(page)
+            print(f"\nFetched {len(page)} Twitter accounts ({len(airtable_records)} so far)")
+            usernames, done = plan_page(PLATFORM, page, plan, changes, checkpoint, queue_update)
+            results.extend(done)
+            print("Processing usernames:", ", ".join(f"@{username}" for username in usernames))
+            results.extend(get_follower_counts(usernames, on_result=on_result,
+                                               **browser_kwargs(args, PLATFORM)))
+    except Exception as e:
+        print(f"Error fetching from Airtable: {str(e)}")
     
-    for result, (record_id, _) in zip(results, airtable_records):
-        count = result['follower_count']
-        if count is not None:
-            updates.append((record_id, int(count)))
-            
-            # Process batch when it reaches size 10 or at the end
-            if len(updates) >= batch_size:
-                if update_airtable_batch(updates):
-                    success_count += len(updates)
-                updates = []
+    # Flush the last partial batch
+    success_count = writer.close()
+    checkpoint.close()
+    
+    if not airtable_records:
+        print("No Twitter usernames found in Airtable.")
+        exit()
     
-    # Process any remaining updates
-    if updates:
-        if update_airtable_batch(updates):
-            success_count += len(updates)
+    print(f"\nProcessed {len(airtable_records)} Twitter accounts")
+    plan.report()
+    changes.report()
+    
+    if not results:
+        print("No follower data retrieved.")
+        exit()
     
     # Separate successful and failed results
     successful_results = []
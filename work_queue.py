@@ -0,0 +1,394 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import argparse
+import threading
+import contextlib
+
+from airtable_client import iter_airtable_pages, not_blank_formula, update_records, WRITE_BATCH_SIZE
+from batch_writer import BatchWriter
+from change_filter import ChangeFilter
+from handles import canonical_handle
+from platforms import PLATFORMS, load_scraper
+from scrape_args import add_browser_arguments, browser_kwargs
+
+# Shared job file; put it on storage every host can reach to spread a run across machines
+QUEUE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'socialscraper', 'work_queue.sqlite3')
+SHARD_SIZE = 10  # Handles leased at a time
+LEASE_SECONDS = 300  # A lease not renewed for this long goes back to the pool
+HEARTBEAT_SECONDS = 30
+MAX_LEASES = 3  # A handle whose worker died this many times is given up on
+
+
+class WorkQueue:
+    """Handles of one scrape job, leased out in shards to workers on any number of hosts.
+
+    A worker leases SHARD_SIZE pending handles, renews its leases with
+    heartbeat() while it scrapes them and completes each one with its result.
+    Leases a dead worker stopped renewing expire and are handed to the next
+    worker that asks, so every handle is scraped once unless its worker dies.
+    Airtable updates are kept in the job until written, so the updates of a
+    worker that died after completing its handles are claimed by another.
+    """
+
+    def __init__(self, job, path=QUEUE_PATH, worker_id=None, lease_seconds=LEASE_SECONDS):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.job = job
+        self.path = path
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        # Transactions are managed explicitly so leasing can take the write lock up front
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                job TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                handle TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                leases INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                PRIMARY KEY (job, platform, handle)
+            );
+            CREATE INDEX IF NOT EXISTS items_state ON items (job, platform, state);
+            CREATE TABLE IF NOT EXISTS records (
+                job TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                handle TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                current INTEGER,
+                PRIMARY KEY (job, platform, handle, record_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                job TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value INTEGER NOT NULL,
+                worker TEXT NOT NULL,
+                PRIMARY KEY (job, record_id, field)
+            );
+            CREATE TABLE IF NOT EXISTS workers (
+                job TEXT NOT NULL,
+                worker TEXT NOT NULL,
+                heartbeat_at REAL NOT NULL,
+                PRIMARY KEY (job, worker)
+            );
+        """)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, platform, records):
+        """Add (record_id, handle, current count) rows; returns how many new handles the job got."""
+        with self._transaction() as conn:
+            before = conn.execute("SELECT COUNT(*) FROM items WHERE job = ? AND platform = ?",
+                                  (self.job, platform)).fetchone()[0]
+            for record_id, handle, current in records:
+                conn.execute("INSERT OR IGNORE INTO items (job, platform, handle) VALUES (?, ?, ?)",
+                             (self.job, platform, handle))
+                conn.execute("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)",
+                             (self.job, platform, handle, record_id, current))
+            after = conn.execute("SELECT COUNT(*) FROM items WHERE job = ? AND platform = ?",
+                                 (self.job, platform)).fetchone()[0]
+        return after - before
+
+    def lease(self, platform, limit=SHARD_SIZE):
+        """Lease up to limit handles: pending ones first, then ones whose lease expired."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("UPDATE items SET state = 'failed', worker = NULL, lease_until = NULL "
+                         "WHERE job = ? AND platform = ? AND state = 'leased' AND lease_until < ? AND leases >= ?",
+                         (self.job, platform, now, MAX_LEASES))
+            rows = conn.execute(
+                "SELECT handle, state FROM items WHERE job = ? AND platform = ? "
+                "AND (state = 'pending' OR (state = 'leased' AND lease_until < ?)) "
+                "ORDER BY state = 'leased', handle LIMIT ?", (self.job, platform, now, limit)).fetchall()
+            conn.executemany(
+                "UPDATE items SET state = 'leased', worker = ?, lease_until = ?, leases = leases + 1 "
+                "WHERE job = ? AND platform = ? AND handle = ?",
+                [(self.worker_id, now + self.lease_seconds, self.job, platform, handle) for handle, _ in rows])
+        expired = sum(1 for _, state in rows if state == 'leased')
+        if expired:
+            print(f"[{platform}] Re-leasing {expired} handles from workers that stopped heartbeating")
+        return [handle for handle, _ in rows]
+
+    def heartbeat(self):
+        """Renew every lease this worker holds."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("UPDATE items SET lease_until = ? WHERE job = ? AND worker = ? AND state = 'leased'",
+                         (now + self.lease_seconds, self.job, self.worker_id))
+            conn.execute("INSERT OR REPLACE INTO workers VALUES (?, ?, ?)", (self.job, self.worker_id, now))
+
+    def complete(self, platform, result):
+        """Store a handle's result and return the (record_id, current count) rows it belongs to."""
+        state = 'done' if result.get('follower_count') is not None else 'failed'
+        with self._transaction() as conn:
+            conn.execute("UPDATE items SET state = ?, result = ?, worker = NULL, lease_until = NULL "
+                         "WHERE job = ? AND platform = ? AND handle = ? AND state != 'done'",
+                         (state, json.dumps(result), self.job, platform, result['username']))
+            return conn.execute("SELECT record_id, current FROM records WHERE job = ? AND platform = ? AND handle = ?",
+                                (self.job, platform, result['username'])).fetchall()
+
+    def leased(self, platform):
+        """Handles of platform this worker still holds."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT handle FROM items WHERE job = ? AND platform = ? AND worker = ? AND state = 'leased'",
+                (self.job, platform, self.worker_id))]
+
+    def fail(self, platform, handles):
+        """Give up on handles this worker leased but got no result for."""
+        with self._transaction() as conn:
+            conn.executemany("UPDATE items SET state = 'failed', worker = NULL, lease_until = NULL "
+                             "WHERE job = ? AND platform = ? AND handle = ? AND worker = ? AND state = 'leased'",
+                             [(self.job, platform, handle, self.worker_id) for handle in handles])
+
+    def release(self):
+        """Hand this worker's unfinished leases straight back, e.g. on Ctrl+C."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE items SET state = 'pending', worker = NULL, lease_until = NULL, leases = leases - 1 "
+                         "WHERE job = ? AND worker = ? AND state = 'leased'", (self.job, self.worker_id))
+            conn.execute("DELETE FROM workers WHERE job = ? AND worker = ?", (self.job, self.worker_id))
+
+    def save_write(self, update):
+        """Keep an Airtable update in the job until forget_writes() is called for it."""
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?)",
+                             [(self.job, update['id'], field, value, self.worker_id)
+                              for field, value in update['fields'].items()])
+
+    def forget_writes(self, updates):
+        """Drop updates Airtable accepted; a newer value saved since is kept."""
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM writes WHERE job = ? AND record_id = ? AND field = ? AND value = ?",
+                             [(self.job, update['id'], field, value)
+                              for update in updates for field, value in update['fields'].items()])
+
+    def claim_writes(self):
+        """Take over the unwritten updates of workers that stopped heartbeating and return them."""
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT record_id, field, value FROM writes WHERE job = ? AND worker != ? AND worker NOT IN "
+                "(SELECT worker FROM workers WHERE job = ? AND heartbeat_at >= ?)",
+                (self.job, self.worker_id, self.job, now - self.lease_seconds)).fetchall()
+            conn.executemany("UPDATE writes SET worker = ? WHERE job = ? AND record_id = ? AND field = ?",
+                             [(self.worker_id, self.job, record_id, field) for record_id, field, _ in rows])
+        return [{'id': record_id, 'fields': {field: value}} for record_id, field, value in rows]
+
+    def unwritten(self):
+        """Airtable updates queued on the job but not yet written."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM writes WHERE job = ?", (self.job,)).fetchone()[0]
+
+    def remaining(self, platform):
+        """Handles not yet done or failed, including ones other workers hold."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items WHERE job = ? AND platform = ? "
+                                      "AND state IN ('pending', 'leased')", (self.job, platform)).fetchone()[0]
+
+    def progress(self):
+        """{platform: {state: count}} for the job."""
+        with self._lock:
+            rows = self._conn.execute("SELECT platform, state, COUNT(*) FROM items WHERE job = ? "
+                                      "GROUP BY platform, state", (self.job,)).fetchall()
+        progress = {}
+        for platform, state, count in rows:
+            progress.setdefault(platform, {})[state] = count
+        return progress
+
+    def workers(self):
+        """(worker, seconds since its last heartbeat) for every worker seen on the job."""
+        with self._lock:
+            rows = self._conn.execute("SELECT worker, heartbeat_at FROM workers WHERE job = ? ORDER BY worker",
+                                      (self.job,)).fetchall()
+        now = time.time()
+        return [(worker, now - heartbeat_at) for worker, heartbeat_at in rows]
+
+class Heartbeat:
+    """Background thread that renews a worker's leases every interval seconds."""
+
+    def __init__(self, queue, interval=HEARTBEAT_SECONDS):
+        self.queue = queue
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.queue.heartbeat()
+            except sqlite3.Error as e:
+                print(f"Heartbeat failed: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+class QueueWriter(BatchWriter):
+    """BatchWriter that keeps every queued update in the job until Airtable has it.
+
+    Handles are done as soon as they are scraped, so an update lost with
+    its worker would never be retried; saved updates are claimed instead.
+    """
+
+    def __init__(self, flush, queue, **kwargs):
+        super().__init__(flush, **kwargs)
+        self.work_queue = queue
+
+    def put(self, update):
+        self.work_queue.save_write(update)
+        super().put(update)
+
+    def _flush(self, batch):
+        # Updates that failed stay saved and are retried by the next worker to claim them
+        written = super()._flush(batch)
+        if written:
+            self.work_queue.forget_writes(written)
+        return written
+
+def replay_claimed_writes(queue, writer):
+    claimed = queue.claim_writes()
+    if claimed:
+        print(f"Replaying {len(claimed)} Airtable updates left by workers that stopped heartbeating")
+    for update in claimed:
+        writer.put(update)
+
+def enqueue_from_airtable(queue, platforms):
+    """Add every canonical handle in Airtable to the job, with the records it belongs to."""
+    fields = [PLATFORMS[platform]['username_field'] for platform in platforms]
+    followers_fields = [PLATFORMS[platform]['followers_field'] for platform in platforms]
+    for page in iter_airtable_pages(fields=fields + followers_fields, formula=not_blank_formula(*fields)):
+        for platform in platforms:
+            config = PLATFORMS[platform]
+            rows = []
+            for record in page:
+                record_fields = record.get('fields', {})
+                handle = canonical_handle(platform, record_fields.get(config['username_field']))
+                if handle:
+                    rows.append((record['id'], handle, record_fields.get(config['followers_field'])))
+            added = queue.enqueue(platform, rows)
+            if rows:
+                print(f"[{platform}] Queued {added} new handles from {len(rows)} records")
+
+def work_platform(queue, platform, writer, changes, args):
+    """Lease, scrape and complete shards of a platform until no handle is left."""
+    scraper = load_scraper(platform)
+    followers_field = PLATFORMS[platform]['followers_field']
+
+    def on_result(result):
+        for record_id, current in queue.complete(platform, result):
+            changes.add(record_id, followers_field, current)
+            # One PATCH per record and platform; other platforms may be on other hosts
+            if result['follower_count'] is not None and changes.should_write(record_id, followers_field,
+                                                                            result['follower_count']):
+                writer.put({'id': record_id, 'fields': {followers_field: int(result['follower_count'])}})
+
+    kwargs = browser_kwargs(args, platform)
+
+    while True:
+        replay_claimed_writes(queue, writer)
+        handles = queue.lease(platform, args.shard_size)
+        if not handles:
+            if not queue.remaining(platform):
+                return
+            # Other workers hold the rest; wait in case their leases expire
+            time.sleep(HEARTBEAT_SECONDS)
+            continue
+        print(f"[{platform}] Leased {len(handles)} handles")
+        try:
+            results = scraper.get_follower_counts(handles, on_result=on_result, **kwargs)
+        except Exception as e:
+            print(f"[{platform}] Error scraping: {str(e)}")
+            results = []
+        # Results that never reached on_result would otherwise stay leased, and heartbeated, forever
+        unfinished = set(queue.leased(platform))
+        for result in results:
+            if result['username'] in unfinished:
+                unfinished.discard(result['username'])
+                on_result(result)
+        if unfinished:
+            print(f"[{platform}] No result for {len(unfinished)} handles; marking them failed")
+            queue.fail(platform, unfinished)
+
+def work(queue, platforms, args):
+    changes = ChangeFilter(args.min_delta)
+    writer = QueueWriter(update_records, queue, batch_size=WRITE_BATCH_SIZE).start()
+    print(f"Worker {queue.worker_id} on job {queue.job}")
+    try:
+        with Heartbeat(queue):
+            threads = [threading.Thread(target=work_platform, args=(queue, platform, writer, changes, args))
+                       for platform in platforms]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        # Flush before releasing, so no other worker claims updates this one is still writing
+        success_count = writer.close()
+        queue.release()
+    changes.report()
+    print(f"Successfully updated {success_count} out of {writer.submitted} records in Airtable")
+
+def print_status(queue):
+    for platform, states in sorted(queue.progress().items()):
+        total = sum(states.values())
+        summary = ', '.join(f"{count} {state}" for state, count in sorted(states.items()))
+        print(f"{platform:<10} {total:>6} handles: {summary}")
+    unwritten = queue.unwritten()
+    if unwritten:
+        print(f"{unwritten} Airtable updates not written yet; the next worker replays them")
+    for worker, age in queue.workers():
+        state = 'alive' if age < queue.lease_seconds else 'dead'
+        print(f"  {worker:<40} last heartbeat {age:>7.0f}s ago ({state})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spread a scrape job over several workers and hosts")
+    parser.add_argument('--path', default=QUEUE_PATH, help="Shared job database file")
+    parser.add_argument('--job', default=time.strftime('%Y-%m-%d'), help="Job name (default: today's date)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = commands.add_parser('enqueue', help="Queue every handle in Airtable for the job")
+    enqueue_parser.add_argument('--platforms', nargs='+', choices=list(PLATFORMS), default=list(PLATFORMS))
+
+    work_parser = commands.add_parser('work', help="Lease and scrape handles until the job is finished")
+    work_parser.add_argument('--platforms', nargs='+', choices=list(PLATFORMS), default=list(PLATFORMS))
+    work_parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help="Handles leased at a time")
+    add_browser_arguments(work_parser)
+
+    commands.add_parser('status', help="Show the job's progress and workers")
+
+    args = parser.parse_args()
+    queue = WorkQueue(args.job, args.path)
+
+    if args.command == 'enqueue':
+        enqueue_from_airtable(queue, args.platforms)
+        print_status(queue)
+    elif args.command == 'work':
+        if not queue.progress():
+            print(f"Job {args.job} has no handles; run enqueue first")
+            sys.exit(1)
+        work(queue, args.platforms, args)
+        print_status(queue)
+    else:
+        print_status(queue)